@@ -29,7 +29,7 @@ import os
 import sys
 import time
 
-import requests
+from transport import session
 from requests_oauthlib import OAuth1
 
 logger = logging.getLogger(__name__)
@@ -85,7 +85,7 @@ class ImageTweet(object):
             "media_category": "tweet_image",
         }
 
-        req = requests.post(url=MEDIA_ENDPOINT_URL, data=request_data, auth=self.oauth)
+        req = session.post(url=MEDIA_ENDPOINT_URL, data=request_data, auth=self.oauth)
         media_id = req.json()["media_id"]
 
         self.media_id = media_id
@@ -109,7 +109,7 @@ class ImageTweet(object):
 
             files = {"media": chunk}
 
-            req = requests.post(url=MEDIA_ENDPOINT_URL, data=request_data, files=files, auth=self.oauth)
+            req = session.post(url=MEDIA_ENDPOINT_URL, data=request_data, files=files, auth=self.oauth)
 
             if req.status_code < 200 or req.status_code > 299:
                 logger.info(req.status_code)
@@ -131,7 +131,7 @@ class ImageTweet(object):
 
         request_data = {"command": "FINALIZE", "media_id": self.media_id}
 
-        req = requests.post(url=MEDIA_ENDPOINT_URL, data=request_data, auth=self.oauth)
+        req = session.post(url=MEDIA_ENDPOINT_URL, data=request_data, auth=self.oauth)
         logger.debug(req.json())
 
         self.processing_info = req.json().get("processing_info", None)
@@ -163,7 +163,7 @@ class ImageTweet(object):
 
         request_params = {"command": "STATUS", "media_id": self.media_id}
 
-        req = requests.get(url=MEDIA_ENDPOINT_URL, params=request_params, auth=self.oauth)
+        req = session.get(url=MEDIA_ENDPOINT_URL, params=request_params, auth=self.oauth)
 
         self.processing_info = req.json().get("processing_info", None)
         self.check_status()
@@ -174,7 +174,7 @@ class ImageTweet(object):
         """
         request_data = {"status": self.status_text, "media_ids": self.media_id}
 
-        req = requests.post(url=POST_TWEET_URL, data=request_data, auth=self.oauth)
+        req = session.post(url=POST_TWEET_URL, data=request_data, auth=self.oauth)
         logger.debug(req.json())
 
 
@@ -203,7 +203,7 @@ class VideoTweet(object):
             "media_category": "tweet_video",
         }
 
-        req = requests.post(url=MEDIA_ENDPOINT_URL, data=request_data, auth=self.oauth)
+        req = session.post(url=MEDIA_ENDPOINT_URL, data=request_data, auth=self.oauth)
         media_id = req.json()["media_id"]
 
         self.media_id = media_id
@@ -227,7 +227,7 @@ class VideoTweet(object):
 
             files = {"media": chunk}
 
-            req = requests.post(url=MEDIA_ENDPOINT_URL, data=request_data, files=files, auth=self.oauth)
+            req = session.post(url=MEDIA_ENDPOINT_URL, data=request_data, files=files, auth=self.oauth)
 
             if req.status_code < 200 or req.status_code > 299:
                 logger.debug(req.status_code)
@@ -249,7 +249,7 @@ class VideoTweet(object):
 
         request_data = {"command": "FINALIZE", "media_id": self.media_id}
 
-        req = requests.post(url=MEDIA_ENDPOINT_URL, data=request_data, auth=self.oauth)
+        req = session.post(url=MEDIA_ENDPOINT_URL, data=request_data, auth=self.oauth)
         logger.debug(req.json())
 
         self.processing_info = req.json().get("processing_info", None)
@@ -281,7 +281,7 @@ class VideoTweet(object):
 
         request_params = {"command": "STATUS", "media_id": self.media_id}
 
-        req = requests.get(url=MEDIA_ENDPOINT_URL, params=request_params, auth=self.oauth)
+        req = session.get(url=MEDIA_ENDPOINT_URL, params=request_params, auth=self.oauth)
 
         self.processing_info = req.json().get("processing_info", None)
         self.check_status()
@@ -292,13 +292,13 @@ class VideoTweet(object):
         """
         request_data = {"status": self.status_text, "media_ids": self.media_id}
 
-        req = requests.post(url=POST_TWEET_URL, data=request_data, auth=self.oauth)
+        req = session.post(url=POST_TWEET_URL, data=request_data, auth=self.oauth)
         logger.debug(req.json())
 
 
 def post_tweet(oauth, message):
     request_data = {"status": message}
-    req = requests.post(url=POST_TWEET_URL, data=request_data, auth=oauth)
+    req = session.post(url=POST_TWEET_URL, data=request_data, auth=oauth)
     logger.debug(req.json)
 
 
@@ -22,7 +22,7 @@
 # SOFTWARE.
 
 import re
-import requests
+from transport import session
 import sys
 from datetime import datetime, timezone
 import logging
@@ -50,7 +50,7 @@ class BlueSkyClient:
                 "password": password
             }
         logger.debug(f"data: {data}")
-        resp = requests.post(url, json=data)
+        resp = session.post(url, json=data)
         resp.raise_for_status()
         return resp.json()
 
@@ -76,7 +76,7 @@ class BlueSkyClient:
             "collection": "app.bsky.feed.post",
             "record": post
         }
-        response = requests.post(url, headers=headers, json=data)
+        response = session.post(url, headers=headers, json=data)
         if response.status_code == 200:
             return response.json()
         message_error = f"Error {response.status_code}: {response.text}"
@@ -86,6 +86,7 @@ class BlueSkyClient:
         try:
             response = self._post(message)
             logger.debug(response)
+            return response
         except Exception as exception:
             logger.error(exception)
 
@@ -100,7 +101,7 @@ class BlueSkyClient:
         facets = []
         url = f"{self._base_url}/xrpc/com.atproto.identity.resolveHandle"
         for m in self.parse_mentions(text):
-            resp = requests.get(url, params={"handle": m["handle"]})
+            resp = session.get(url, params={"handle": m["handle"]})
             # if handle couldn't be resolved, just skip it! will be text in the
             # post
             if resp.status_code == 400:
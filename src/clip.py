@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import logging
+import os
+from plumbum import local
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+# what every platform accepts without processing the video again
+PROFILES = {
+    "twitter": {"max_bytes": 512 * MB,
+                "max_height": 1080,
+                "max_video_bitrate": 6000,
+                "audio_bitrate": 128},
+    "mastodon": {"max_bytes": 40 * MB,
+                 "max_height": 720,
+                 "max_video_bitrate": 2500,
+                 "audio_bitrate": 128},
+}
+THREADS = int(os.getenv("CLIP_THREADS", 2))
+
+
+def video_bitrate(profile, duration):
+    """The kbit/s of the video that fits the clip in the profile."""
+    total = profile["max_bytes"] * 8 * 0.95 / 1000 / max(duration, 1)
+    return int(max(min(total - profile["audio_bitrate"],
+                       profile["max_video_bitrate"]), 100))
+
+
+def can_copy(streams, profile):
+    """True if the streams can be copied as they are for the profile."""
+    codecs = {stream.get("codec_type"): stream for stream in streams}
+    video = codecs.get("video")
+    audio = codecs.get("audio")
+    return video is not None and video.get("codec_name") == "h264" and \
+        int(video.get("height", 0)) <= profile["max_height"] and \
+        (audio is None or audio.get("codec_name") == "aac")
+
+
+def probe(source):
+    ffprobe = local["ffprobe"]
+    output = ffprobe["-v", "error", "-show_entries",
+                     "stream=codec_type,codec_name,height", "-of", "json",
+                     source]()
+    return json.loads(output).get("streams", [])
+
+
+def make_clip(source, destination, start, end, profile):
+    """
+    Writes the clip from start to end seconds of source for the profile.
+
+    The moov atom goes to the front of the file (faststart), so the
+    platforms can process it while it is uploaded. The streams are copied when the platform
+    accepts them and the clip fits in its size, otherwise they are
+    encoded with x264 at the bitrate that fits, with THREADS threads.
+
+    :param profile: One of PROFILES.
+    """
+    ffmpeg = local["ffmpeg"]
+    duration = end - start
+    logger.info(f"Start clip from {start} to {end}")
+    common = ["-y", "-ss", str(start), "-i", source, "-t", str(duration),
+              "-map", "0:v:0", "-map", "0:a:0?", "-movflags", "+faststart",
+              "-avoid_negative_ts", "make_zero"]
+    if can_copy(probe(source), profile):
+        ffmpeg[common + ["-c", "copy", destination]]()
+        if os.path.getsize(destination) <= profile["max_bytes"]:
+            logger.info("End clip, copied")
+            return destination
+    bitrate = video_bitrate(profile, duration)
+    ffmpeg[common + ["-c:v", "libx264", "-preset", "veryfast",
+                     "-profile:v", "high", "-pix_fmt", "yuv420p",
+                     "-b:v", f"{bitrate}k", "-maxrate", f"{bitrate}k",
+                     "-bufsize", f"{bitrate * 2}k",
+                     "-vf", f"scale=-2:'min({profile['max_height']},ih)'",
+                     "-threads", str(THREADS),
+                     "-c:a", "aac", "-b:a", f"{profile['audio_bitrate']}k",
+                     destination]]()
+    logger.info("End clip, encoded")
+    return destination
@@ -1,5 +1,5 @@
 import logging
-import requests
+from transport import session
 
 
 logger = logging.getLogger(__name__)
@@ -19,6 +19,9 @@ class Discord:
         payload = {
             "content": message
         }
-        response = requests.post(self._base_url, data=payload, timeout=TIMEOUT)
+        # wait for the message, otherwise the webhook returns no content
+        response = session.post(self._base_url, params={"wait": "true"},
+                                data=payload, timeout=TIMEOUT)
         if not response.ok:
             raise DiscordException(f"Error: {response.text}")
+        return response.json()
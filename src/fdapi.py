@@ -24,7 +24,7 @@
 import os
 import time
 import mimetypes
-import requests
+from transport import UPLOAD_TIMEOUT, session
 import toml
 import logging
 
@@ -48,7 +48,7 @@ class PeerTube:
         headers = {
                 "Authorization": f"{token_type} {access_token}",
                 }
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers)
         if response.status_code == 200:
             return response.json()
         return {}
@@ -57,7 +57,7 @@ class PeerTube:
         base_url = self.conf['credentials']['base_url']
         url = f"{base_url}/accounts/{name}/videos"
         logger.debug(f"Url: {url}")
-        response = requests.get(url)
+        response = session.get(url)
         if response.status_code == 200:
             return response.json()
         print(response.status_code)
@@ -128,14 +128,14 @@ class PeerTube:
         logger.info(f"Going to upload {filepath} with mimetype {mimetype}")
         with open(filepath, 'rb') as file_reader:
             files = {"videofile": (filename, file_reader, mimetype)}
-            response = requests.post(url, headers=headers, data=data,
-                                     files=files)
+            response = session.post(url, headers=headers, data=data,
+                                    files=files, timeout=UPLOAD_TIMEOUT)
             logger.debug(response.status_code)
             logger.debug(response.content)
             if response.status_code == 200:
-                return True
+                return response.json().get("video", {}).get("uuid")
             logger.error(f"Can't download {filepath}")
-        return False
+        return None
 
     def get_video_info(self, id):
         base_url = self.conf['credentials']['base_url']
@@ -146,7 +146,7 @@ class PeerTube:
         headers = {
                 "Authorization": f"{token_type} {access_token}",
                 }
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers)
         if response.status_code == 200:
             return response.json()
         msg = f"HTTP Error code {response.status_code}. {response.text}"
@@ -161,7 +161,7 @@ class PeerTube:
         headers = {
                 "Authorization": f"{token_type} {access_token}",
                 }
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers)
         return response
 
     def download_video_file(self, filename):
@@ -173,7 +173,7 @@ class PeerTube:
         headers = {
                 "Authorization": f"{token_type} {access_token}",
                 }
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers)
         return response
 
     def logout(self):
@@ -185,7 +185,7 @@ class PeerTube:
                 "Authorization": f"{token_type} {access_token}",
                 }
         try:
-            requests.post(url, headers=headers)
+            session.post(url, headers=headers)
         finally:
             self.conf['token']['expires_in'] = 0
             self.conf['token']['refresh_token_expires_in'] = 0
@@ -216,7 +216,7 @@ class PeerTube:
     def __login_prerequisite(self):
         base_url = self.conf['credentials']['base_url']
         url = f"{base_url}/oauth-clients/local"
-        response = requests.get(url)
+        response = session.get(url)
         if response.status_code == 200:
             self.conf['client'] = response.json()
             self.__save_conf()
@@ -238,7 +238,7 @@ class PeerTube:
                 "username": username,
                 "password": password
                 }
-        response = requests.post(url, data=data)
+        response = session.post(url, data=data)
         if response.status_code == 200:
             data = response.json()
             timestamp = int(time.time())
@@ -261,7 +261,7 @@ class PeerTube:
                 "grant_type": "refresh_token",
                 "refresh_token": refresh_token
                 }
-        response = requests.post(url, data=data)
+        response = session.post(url, data=data)
         if response.status_code == 200:
             data = response.json()
             timestamp = int(time.time())
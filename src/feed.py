@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+import xml.etree.ElementTree as ET
+from transport import session
+
+logger = logging.getLogger(__name__)
+
+FEED_URL = "https://www.youtube.com/feeds/videos.xml"
+ATOM = "{http://www.w3.org/2005/Atom}"
+YT = "{http://www.youtube.com/xml/schemas/2015}"
+
+
+def parse(stream):
+    """Yields the videos of an Atom feed of YouTube as they are read.
+
+    The feed is parsed as a stream and every entry is dropped once it has
+    been read, so stopping early does not read the rest.
+
+    :param stream: A binary file like object with the feed.
+    """
+    for _, element in ET.iterparse(stream, events=("end",)):
+        if element.tag != f"{ATOM}entry":
+            continue
+        link = element.find(f"{ATOM}link")
+        yield {"yt_id": element.findtext(f"{YT}videoId"),
+               "title": element.findtext(f"{ATOM}title"),
+               "link": link.get("href") if link is not None else None,
+               "published_at": element.findtext(f"{ATOM}published")}
+        element.clear()
+
+
+class ChannelFeed:
+    """The public Atom feed of a YouTube channel.
+
+    It costs no quota and has the last 15 videos, the newest first, but
+    not their full description, so it is used to know if there is
+    something new and the API to read it. The feed is requested with
+    If-None-Match and If-Modified-Since, so a feed that did not change is
+    not downloaded again.
+    """
+
+    def __init__(self, channel_id):
+        self._channel_id = channel_id
+        self._etag = None
+        self._last_modified = None
+        self._latest = None
+
+    def latest(self):
+        """Returns the newest video of the feed, or None if it failed."""
+        headers = {}
+        if self._latest:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        try:
+            response = session.get(FEED_URL,
+                                   params={"channel_id": self._channel_id},
+                                   headers=headers, stream=True)
+        except Exception as exception:
+            logger.error(exception)
+            return None
+        try:
+            if response.status_code == 304:
+                logger.debug("Feed not modified")
+                return self._latest
+            if response.status_code != 200:
+                logger.error(response.status_code)
+                return None
+            response.raw.decode_content = True
+            latest = next(parse(response.raw), None)
+        except ET.ParseError as exception:
+            logger.error(exception)
+            return None
+        finally:
+            response.close()
+        self._etag = response.headers.get("ETag")
+        self._last_modified = response.headers.get("Last-Modified")
+        self._latest = latest
+        return latest
+
+    def changed(self, yt_id):
+        """True if the newest video of the feed is not yt_id.
+
+        If the feed can not be read it is True too, so the caller asks
+        the API.
+        """
+        latest = self.latest()
+        return latest is None or latest["yt_id"] != yt_id
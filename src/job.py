@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import logging
+import time
+from table import Table
+
+logger = logging.getLogger(__name__)
+
+
+class Job(Table):
+    __slots__ = ()
+    TABLE = 'JOBS'
+    UNIKEYS = ['yt_id', 'destination']
+    CREATE_TABLE_QUERY = (f"CREATE TABLE IF NOT EXISTS {TABLE}("
+                          "ID INTEGER PRIMARY KEY AUTOINCREMENT,"
+                          "YT_ID TEXT,"
+                          "DESTINATION TEXT,"
+                          "STATE TEXT,"
+                          "ATTEMPTS INTEGER,"
+                          "NEXT_RUN_AT INTEGER,"
+                          "PAYLOAD TEXT,"
+                          "ERROR TEXT,"
+                          "UPDATED_AT INTEGER)")
+    MIGRATIONS = [
+        [f"CREATE UNIQUE INDEX IF NOT EXISTS {TABLE}_YT_ID_DESTINATION "
+         f"ON {TABLE}(yt_id, destination)",
+         f"CREATE INDEX IF NOT EXISTS {TABLE}_STATE_NEXT_RUN_AT "
+         f"ON {TABLE}(state, next_run_at)"],
+    ]
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    @classmethod
+    def enqueue(cls, yt_video, destinations):
+        """
+        Creates one pending job for every destination of a video.
+
+        Destinations that already have a job for this video are skipped, so
+        enqueuing the same video twice does not publish it twice.
+
+        :param yt_video: The video as a dict, it is stored as the payload.
+        :param destinations: The names of the destinations.
+        :return: The list of new jobs.
+        """
+        jobs = []
+        now = int(time.time())
+        payload = json.dumps(yt_video)
+        for destination in destinations:
+            job = cls.from_dict({"yt_id": yt_video["yt_id"],
+                                 "destination": destination,
+                                 "state": cls.PENDING,
+                                 "attempts": 0,
+                                 "next_run_at": now,
+                                 "payload": payload,
+                                 "updated_at": now})
+            if job.exists():
+                continue
+            job.save()
+            jobs.append(job)
+        return jobs
+
+    @classmethod
+    def next_due(cls):
+        """
+        Returns the pending job that should run first, or None if there is
+        no pending job whose next run time has already arrived.
+        """
+        return cls.find(state=cls.PENDING)\
+            .where("next_run_at", "<=", int(time.time()))\
+            .order_by("next_run_at").order_by("id").first()
+
+    @classmethod
+    def recover(cls):
+        """
+        Puts back in the queue the jobs that were running when the process
+        stopped.
+
+        :return: The number of recovered jobs.
+        """
+        items = cls.find(state=cls.RUNNING).all()
+        for job in items:
+            logger.info("Recover job %s %s", job.yt_id, job.destination)
+            job._update(cls.PENDING)
+        return len(items)
+
+    def get_payload(self):
+        return json.loads(self.payload)
+
+    def start(self):
+        self.attempts = (self.attempts or 0) + 1
+        self._update(self.RUNNING)
+
+    def done(self):
+        self.error = None
+        self._update(self.DONE)
+
+    def fail(self, error, max_attempts, backoff):
+        """
+        Registers a failed attempt.
+
+        The job goes back to the queue with an exponential backoff until it
+        reaches `max_attempts`, then it stays failed.
+        """
+        self.error = str(error)
+        if self.attempts < max_attempts:
+            delay = backoff * 2 ** (self.attempts - 1)
+            self.next_run_at = int(time.time() + delay)
+            self._update(self.PENDING)
+        else:
+            self._update(self.FAILED)
+
+    def _update(self, state):
+        self.state = state
+        self.updated_at = int(time.time())
+        self.save()
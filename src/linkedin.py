@@ -1,5 +1,6 @@
 import logging
 import requests
+from transport import session
 import uuid
 import secrets
 import urllib.parse
@@ -40,7 +41,7 @@ class LinkedIn:
         }
         auth_url = "https://www.linkedin.com/oauth/v2/authorization?" + urllib.parse.urlencode(params)
         print(auth_url)
-        response = requests.get(url, params=params, timeout=TIMEOUT)
+        response = session.get(url, params=params, timeout=TIMEOUT)
         if not response.ok:
             raise LinkedInException(f"Error: {response.text}")
         return response.text
@@ -60,7 +61,7 @@ class LinkedIn:
             "Content-Type": "application/x-www-form-urlencoded",
         }
         try:
-            response = requests.post(
+            response = session.post(
                 "https://www.linkedin.com/oauth/v2/accessToken",
                 headers=headers,
                 data=payload,
@@ -112,8 +113,8 @@ class LinkedIn:
         }
         print("payload: %s", payload)
         url = f"{self._base_url}/v2/ugcPosts"
-        response = requests.post(url, json=payload, headers=self._headers,
-                                 timeout=TIMEOUT)
+        response = session.post(url, json=payload, headers=self._headers,
+                                timeout=TIMEOUT)
         if not response.ok:
             raise LinkedInException(f"Error: {response.text}")
         return response
@@ -22,14 +22,17 @@
 # SOFTWARE.
 
 
+import asyncio
+import base64
+import json
 import os
 import sys
 import logging
-from threading import Thread
+from contextlib import asynccontextmanager
 from secrets import compare_digest
-from plumbum import local
 from retry import retry
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import (FastAPI, Depends, HTTPException, status, Request,
+                     Response, Header)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.templating import Jinja2Templates
@@ -48,10 +51,30 @@ from fdapi import PeerTube
 from zinc import ZincClient
 from utils import Processor
 from discord import Discord
+from feed import ChannelFeed
+from clip import PROFILES, make_clip
+from media import CLIP_SECONDS, clip_key, fetch_media
+from mediacache import MediaCache
+from pagecache import PageCache
+from job import Job
+from publication import Publication
+from responsecache import CachedResponse, ResponseCache
+from worker import WorkerPool
+from workspace import Workspaces
+import transport
 from linkedin import LinkedIn
 
-Table.DATABASE = "/app/database.db"
+# a directory, so the -wal and -shm files of SQLite are kept with the database
+Table.DATABASE = "/app/data/database.db"
 processor = Processor("/app/templates")
+workspaces = Workspaces()
+media_cache = MediaCache()
+video_pages = PageCache()
+youtube_cache = ResponseCache()
+feeds = {}
+VIDEOS_PAGE_SIZE = int(os.getenv("VIDEOS_PAGE_SIZE", 100))
+VIDEOS_MAX_PAGE_SIZE = 1000
+YT_POLLING = os.getenv("YT_POLLING", "uploads")
 
 FORMAT = "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
 LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
@@ -60,7 +83,21 @@ logging.basicConfig(stream=sys.stdout,
                     level=logging.getLevelName(LOG_LEVEL))
 logger = logging.getLogger(__name__)
 Video.inicializate()
-app = FastAPI()
+Job.inicializate()
+Publication.inicializate()
+CachedResponse.inicializate()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(workspaces.clean)
+    await workers.start()
+    yield
+    await workers.stop()
+    Table.close_connections()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -122,6 +159,11 @@ async def get_status():
     return {"status": "OK", "message": "Up and running"}
 
 
+@app.get("/stats/http/", dependencies=[Depends(authorize)])
+async def get_http_stats():
+    return transport.stats()
+
+
 @app.get("/register", dependencies=[Depends(authorize)])
 async def register(request: Request):
     tw = Twitter(TW_CONFIG)
@@ -152,68 +194,111 @@ async def get_redirect(request: Request):
 @app.get("/update/")
 async def update():
     logger.debug("Self update yt-dlp")
-    YtDlMan.self_update()
+    await asyncio.to_thread(YtDlMan.self_update)
     yt_channel = os.getenv("YT_CHANNEL")
     yt_key = os.getenv("YT_KEY")
-    youtube = YouTube(yt_key)
-    db_video = Video.get_last_video_published()
-    if db_video:
+    youtube = YouTube(yt_key, youtube_cache)
+    db_video = await asyncio.to_thread(Video.get_last_video_published)
+    feed = feeds.setdefault(yt_channel, ChannelFeed(yt_channel))
+    if db_video and not await asyncio.to_thread(feed.changed,
+                                                db_video.yt_id):
+        # the feed costs no quota, the API is only asked when it changes
+        await asyncio.to_thread(populate_in_zs,
+                                [{"status": "publicado",
+                                  "data": db_video.serialize()}])
+        logger.info("Publicado")
+    elif db_video:
         logger.debug("published_at: %s", db_video.published_at)
         # yt_videos = YtDlMan.get_videos(yt_channel, db_video.published_at)
-        yt_videos = youtube.get_videos(yt_channel, db_video.published_at)
-        for yt_video in yt_videos:
-            if yt_video["yt_id"] != db_video.yt_id:
-                logger.info("Sin publicar")
-                athread = Thread(target=populate, args=(yt_video,))
-                athread.daemon = True
-                athread.start()
-                break
-            else:
-                populate_in_zs([{"status": "publicado", "data": yt_video}])
-                logger.info("Publicado")
+        yt_videos = poll(youtube, yt_channel, db_video.published_at)
+        # only the newest video is checked, so only its page is requested
+        yt_video = await asyncio.to_thread(next, yt_videos, None)
+        if yt_video and yt_video["yt_id"] != db_video.yt_id:
+            logger.info("Sin publicar")
+            await asyncio.to_thread(enqueue, yt_video)
+            workers.wake()
+        elif yt_video:
+            await asyncio.to_thread(populate_in_zs,
+                                    [{"status": "publicado",
+                                      "data": yt_video}])
+            logger.info("Publicado")
     else:
         # yt_videos = YtDlMan.get_videos(yt_channel)
-        yt_videos = youtube.get_videos(yt_channel)
-        for yt_video in yt_videos:
-            Video.new(yt_video['title'],
-                      yt_video['description'],
-                      yt_video['yt_id'],
-                      yt_video['link'],
-                      yt_video['published_at'])
+        await asyncio.to_thread(save_videos, poll(youtube, yt_channel))
     return {"status": "OK", "message": "Update completed"}
 
 
+def encode_cursor(after):
+    return base64.urlsafe_b64encode(json.dumps(after).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        published_at, id = json.loads(base64.urlsafe_b64decode(cursor))
+        return published_at, int(id)
+    except Exception as exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Invalid cursor") from exception
+
+
+def videos_page(cursor, limit):
+    videos, after = Video.page(decode_cursor(cursor) if cursor else None,
+                               limit)
+    headers = {}
+    if after:
+        headers["Link"] = (f'</videos/?cursor={encode_cursor(after)}'
+                           f'&limit={limit}>; rel="next"')
+    return [video.serialize() for video in videos], headers
+
+
 @app.get("/videos/")
-async def get_videos():
-    videos = Video.select()
-    return sorted(videos, key=lambda k: k.published_at)
+async def get_videos(cursor: str = None, limit: int = VIDEOS_PAGE_SIZE,
+                     if_none_match: str = Header(None)):
+    """Videos by publication date, a page at a time.
 
+    The cursor of the next page, if any, is in the Link header, and a
+    request with the ETag of the page in If-None-Match gets a 304 while
+    the videos do not change.
+    """
+    limit = max(1, min(limit, VIDEOS_MAX_PAGE_SIZE))
+    etag, body, headers = await asyncio.to_thread(
+        video_pages.get, (cursor, limit), Video.revision(),
+        lambda: videos_page(cursor, limit))
+    headers = {**headers, "ETag": etag, "Cache-Control": "no-cache"}
+    if PageCache.matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                        headers=headers)
+    return Response(content=body, media_type="application/json",
+                    headers=headers)
 
-def populate(yt_video):
-    populate_in_zs([yt_video])
-    # destino = "/tmp/destino.mp4"
-    # thumbnail_file = "/tmp/thumbnail.jpg"
-    # clean(origen, destino, thumbnail_file)
-    # yt_id = yt_video["yt_id"]
-    # title = yt_video['title']
-    # description = yt_video["description"]
-    # link = yt_video['link']
-    # message = title + '\n\n'
-    # largo = 270 - len(message) - len(link)
-    # message += yt_video['description'][0:largo] + '...\n\n' + link
-    # message_discord = f"**{title}**\n"
-    # message_discord += yt_video["description"] + "\n" + link
-    # message_mastodon = f"{title}\n{description}"
-    # message_matrix = f"{title}\n{description}"
-    # max_length = 479 - len(link)
-    # if len(message_mastodon) > max_length:
-    #     message_mastodon = message_mastodon[:max_length]
-    # message_mastodon = f"{message_mastodon}\n#atareaoConLinux\n{link}"
-    # message_bluesky = f"{title}\n{description}"
-    # end_bluesky = f"\n\n#atareaoConLinux\n\n{link}"
-    # message_bluesky = message_bluesky[:256 - len(end_bluesky)] + end_bluesky
+
+@app.get("/jobs/", dependencies=[Depends(authorize)])
+async def get_jobs():
+    return await asyncio.to_thread(Job.select)
+
+
+def poll(youtube, yt_channel, published_after=None):
+    """Iterates the videos of the channel, the newest first.
+
+    They are read from the uploads playlist by default, YT_POLLING=search
+    uses the search endpoint, that costs 100 quota units by page instead
+    of one.
+    """
+    if YT_POLLING == "search":
+        return youtube.iter_videos(yt_channel, published_after)
+    return youtube.iter_uploads(yt_channel, published_after)
+
+
+def save_videos(yt_videos):
+    saved = Video.new_many(list(yt_videos))
+    logger.info("Saved %s YouTube videos", saved)
+
+
+def save_video(yt_video):
     try:
-        # convert(origen, destino)
+        if Video.find_by_yt_id(yt_video['yt_id']):
+            logger.info("YouTube video already saved")
+            return True
         logger.info("Start save YouTube video")
         Video.new(yt_video['title'],
                   yt_video['description'],
@@ -221,81 +306,113 @@ def populate(yt_video):
                   yt_video['link'],
                   yt_video['published_at'])
         logger.info("End save YouTube video")
+        return True
     except Exception as exception:
         logger.error(exception)
         logger.info("Can not continue")
+    return False
+
+
+def enqueue(yt_video):
+    populate_in_zs([yt_video])
+    if not save_video(yt_video):
+        return []
+    jobs = Job.enqueue(yt_video, JOB_HANDLERS)
+    logger.info("%s jobs enqueued for %s", len(jobs), yt_video["yt_id"])
+    return jobs
+
+
+def is_media_pending(yt_video):
+    return any(not Publication.is_done(yt_video["yt_id"], destination)
+               for destination in MEDIA_DESTINATIONS)
+
+
+def populate_in_media(yt_video):
+    if not is_media_pending(yt_video):
+        logger.info("Media already published")
         return
+    # every video has its own files, so media jobs can run at the same time,
+    # and a retry resumes the partial download of the failed attempt
+    # the cached files of the job are not evicted until it ends
+    with workspaces.open(yt_video["yt_id"]) as workspace, \
+            media_cache.lease() as lease:
+        populate_media(yt_video, workspace, lease)
+
+
+def download_media(yt_id, directory, lease=None):
+    return fetch_media(media_cache, yt_id, directory, MEDIA_DESTINATIONS,
+                       lease)
+
+
+def clip(yt_id, origen, directory, profile, lease=None):
+    """Returns the path of the clip for the profile.
+
+    It is cut from origen, or from the clip downloaded when there is no
+    origen, and kept in the media cache by profile. It raises if there is
+    no video to cut it from, a post without the video is not published.
+    """
+    source = origen or media_cache.get(clip_key(yt_id), ".mp4", lease)
+    if source is None:
+        raise Exception(f"There is no video to cut the clip of {yt_id}")
+    destino, _ = media_cache.fetch(
+        {**clip_key(yt_id), "profile": profile}, "destino.mp4",
+        lambda directory: make_clip(source,
+                                    os.path.join(directory, "destino.mp4"),
+                                    0, CLIP_SECONDS, PROFILES[profile]),
+        directory, lease)
+    return destino
+
+
+def populate_media(yt_video, workspace, lease=None):
+    """Publishes the video in every media destination.
+
+    If the download fails every pending destination fails, so none of them
+    is published without the video. Otherwise a failed destination does
+    not stop the others, but an exception is raised at the end so the job
+    is retried. The ones already done are skipped on the next attempt.
+    """
+    yt_id = yt_video["yt_id"]
+    errors = []
     try:
-        logger.debug("=== Telegram Channel ===")
-        populate_in_telegram(yt_video)
-    except Exception as exception:
-        logger.error(exception)
-    try:
-        logger.debug("=== Telegram Group ===")
-        populate_in_telegram_group(yt_video)
-    except Exception as exception:
-        logger.error(exception)
-    try:
-        logger.debug("=== Discord ===")
-        populate_in_discord(yt_video)
-    except Exception as exception:
-        logger.error(exception)
-    try:
-        logger.debug("=== Bluesky ===")
-        populate_in_bluesky(yt_video)
-    except Exception as exception:
-        logger.error(exception)
-    try:
-        logger.debug("=== Threads ===")
-        populate_in_threads(yt_video)
-    except Exception as exception:
-        logger.error(exception)
+        report, origen = download_media(yt_id, workspace.directory, lease)
+    except Exception:
+        for destination in MEDIA_DESTINATIONS:
+            if not Publication.is_done(yt_id, destination):
+                Publication.record(yt_id, destination, Publication.FAILED)
+        raise
+    populate_in_zs([{"status": "download", "report": report}])
     try:
-        logger.debug("=== Matrix ===")
-        populate_in_matrix(yt_video)
-    except Exception as exception:
-        logger.error(exception)
-    try:
-        logger.debug("=== LinkedIn ===")
-        populate_in_linkedin(yt_video)
-    except Exception as exception:
-        logger.error(exception)
-
-    origen = "/tmp/origen.mp4"
-    destino = "/tmp/destino.mp4"
-    clean(origen, destino)
-    try:
-        YtDlMan.download(yt_video["yt_id"])
-        title = yt_video['title']
-        description = yt_video["description"]
-        export2PeerTube(title, description, origen)
+        if origen:
+            title = yt_video['title']
+            description = yt_video["description"]
+            Publication.run(yt_id, "peertube", export2PeerTube, title,
+                            description, origen)
     except Exception as exception:
         logger.error(exception)
+        errors.append(f"peertube: {exception}")
 
-    if os.path.exists(origen):
-        convert(origen, destino)
-    else:
-        destino = None
     try:
         logger.debug("=== Twitter ===")
-        populate_in_x(yt_video, destino)
+        if not Publication.is_done(yt_id, "twitter"):
+            destino = clip(yt_id, origen, workspace.directory, "twitter",
+                           lease)
+            Publication.run(yt_id, "twitter", populate_in_x, yt_video,
+                            destino)
     except Exception as exception:
         logger.error(exception)
+        errors.append(f"twitter: {exception}")
     try:
         logger.debug("=== Mastodon ===")
-        populate_in_mastodon(yt_video, destino)
+        if not Publication.is_done(yt_id, "mastodon"):
+            destino = clip(yt_id, origen, workspace.directory, "mastodon",
+                           lease)
+            Publication.run(yt_id, "mastodon", populate_in_mastodon,
+                            yt_video, destino)
     except Exception as exception:
         logger.error(exception)
-
-    clean(origen, destino)
-
-
-def convert(origen, destino):
-    logger.info("Start cutting")
-    ffmpeg = local['ffmpeg']
-    ffmpeg["-y", "-ss", "0", "-to", "45", "-i", origen, "-c", "copy",
-           destino]()
-    logger.info("End cutting")
+        errors.append(f"mastodon: {exception}")
+    if errors:
+        raise Exception(". ".join(errors))
 
 
 @retry(tries=3, delay=10, logger=logger)
@@ -305,12 +422,13 @@ def populate_in_x(yt_video, video=None):
     tw = Twitter(config_file)
     message = processor.process(yt_video, "twitter.html")
     if video:
-        tw.populate_video(message, video)
+        response = tw.populate_video(message, video)
     else:
         tw.update_access_token()
-        tw.send_message(message)
+        response = tw.send_message(message)
     populate_in_zs([{"destination": "twitter", "message": message}])
     logger.info("End tweeting")
+    return response.get("data", {}).get("id") if response else None
 
 
 @retry(tries=3, delay=5, logger=logger)
@@ -321,11 +439,12 @@ def populate_in_mastodon(yt_video, video=None):
     mastodon_client = MastodonClient(base_uri, access_token)
     message = processor.process(yt_video, "mastodon.html")
     if video:
-        mastodon_client.toot_with_media(message, video)
+        response = mastodon_client.toot_with_media(message, video)
     else:
-        mastodon_client.send_message(message)
+        response = mastodon_client.send_message(message)
     populate_in_zs([{"destination": "mastodon", "message": message}])
     logger.info("End message in Mastodon")
+    return response.get("id") if response else None
 
 
 @retry(tries=3, delay=5, logger=logger)
@@ -336,9 +455,10 @@ def populate_in_matrix(yt_video):
     room = os.getenv("MATRIX_ROOM")
     matrix_client = MatrixClient(base_url, token, room)
     message = processor.process(yt_video, "matrix.html")
-    matrix_client.populate(message)
+    response = matrix_client.populate(message)
     populate_in_zs([{"destination": "matrix", "message": message}])
     logger.info("End message in Matrix")
+    return response.get("event_id") if response else None
 
 
 @retry(tries=3, delay=5, logger=logger)
@@ -349,9 +469,10 @@ def populate_in_bluesky(yt_video):
     password = os.getenv("BLUESKY_PASSWORD")
     blue_sky_client = BlueSkyClient(base_url, user, password)
     message = processor.process(yt_video, "bluesky.html")
-    blue_sky_client.post(message)
+    response = blue_sky_client.post(message)
     populate_in_zs([{"destination": "bluesky", "message": message}])
     logger.info("End message in BlueSky")
+    return response.get("uri") if response else None
 
 
 @retry(tries=3, delay=5, logger=logger)
@@ -361,9 +482,10 @@ def populate_in_discord(yt_video):
     token = os.getenv("DISCORD_TOKEN")
     discord = Discord(channel, token)
     message = processor.process(yt_video, "discord.html")
-    discord.send_message(message)
+    response = discord.send_message(message)
     populate_in_zs([{"destination": "discord", "message": message}])
     logger.info("End message in Discord")
+    return response.get("id")
 
 
 @retry(tries=3, delay=5, logger=logger)
@@ -373,9 +495,10 @@ def populate_in_linkedin(yt_video):
     token = os.getenv("LINKEDIN_ACCESS_TOKEN")
     linkedin = LinkedIn(organization, token)
     message = processor.process(yt_video, "linkedin.html")
-    linkedin.send_message(message)
+    response = linkedin.send_message(message)
     populate_in_zs([{"destination": "linkedin", "message": message}])
     logger.info("End message in LinkedIn")
+    return response.headers.get("x-restli-id") or response.json().get("id")
 
 
 @retry(tries=3, delay=5, logger=logger)
@@ -385,9 +508,10 @@ def populate_in_telegram(yt_video):
     token = os.getenv("TELEGRAM_TOKEN")
     telegram = Telegram(token)
     message = processor.process(yt_video, "telegram.html")
-    telegram.send_message(message, chat_id)
+    response = telegram.send_message(message, chat_id)
     populate_in_zs([{"destination": "telegram", "message": message}])
     logger.info("End message in Telegram")
+    return response.get("result", {}).get("message_id")
 
 
 @retry(tries=3, delay=5, logger=logger)
@@ -396,9 +520,10 @@ def populate_in_threads(yt_video):
     config_file = os.getenv("TH_CONFIG")
     threads = Threads(config_file)
     message = processor.process(yt_video, "threads.html")
-    threads.populate_text(message)
+    response = threads.populate_text(message)
     populate_in_zs([{"destination": "threads", "message": message}])
     logger.info("End message in Threads")
+    return response.get("id")
 
 
 @retry(tries=3, delay=5, logger=logger)
@@ -413,9 +538,10 @@ def populate_in_telegram_group(yt_video):
         thread_id = None
     telegram = Telegram(token)
     message = processor.process(yt_video, "telegram.html")
-    telegram.send_message(message, chat_id, thread_id)
+    response = telegram.send_message(message, chat_id, thread_id)
     populate_in_zs([{"destination": "telegram", "message": message}])
     logger.info("End message in Telegram")
+    return response.get("result", {}).get("message_id")
 
 
 @retry(tries=3, delay=60, logger=logger)
@@ -426,16 +552,39 @@ def export2PeerTube(title, description, filename):
     peertube = PeerTube(pt_path)
     response = peertube.upload(channel_id, filename, title, description)
     logger.info(response)
+    if not response:
+        raise Exception(f"Can not upload {filename} to PeerTube")
     populate_in_zs([{"destination": "peertube", "data": channel_id,
                     "title": title, "description": description}])
     logger.info("End export to PeerTube")
-
-
-def clean(origen, destino=None, thumbnail_file=None):
-    if os.path.exists(origen):
-        os.remove(origen)
-    if destino and os.path.exists(destino):
-        os.remove(destino)
-    if thumbnail_file and os.path.exists(thumbnail_file):
-        os.remove(thumbnail_file)
-
+    return response
+
+
+def tracked(destination, function):
+    def publish(yt_video):
+        return Publication.run(yt_video["yt_id"], destination, function,
+                               yt_video)
+    return publish
+
+
+TEXT_DESTINATIONS = {name: tracked(name, function) for name, function in {
+    "telegram": populate_in_telegram,
+    "telegram_group": populate_in_telegram_group,
+    "discord": populate_in_discord,
+    "bluesky": populate_in_bluesky,
+    "threads": populate_in_threads,
+    "matrix": populate_in_matrix,
+    "linkedin": populate_in_linkedin,
+}.items()}
+# PeerTube is disabled without PT_PATH
+MEDIA_DESTINATIONS = (["peertube"] if os.getenv("PT_PATH") else []) + \
+    ["twitter", "mastodon"]
+# media is enqueued first, so its long download starts before the text jobs
+JOB_HANDLERS = {
+    "media": populate_in_media,
+    **TEXT_DESTINATIONS,
+}
+# media downloads and uploads whole videos, three tries of the PeerTube
+# upload with its 1800 seconds of read timeout alone take an hour and a half
+workers = WorkerPool(JOB_HANDLERS, timeouts={
+    "media": float(os.getenv("JOB_MEDIA_TIMEOUT", "14400"))})
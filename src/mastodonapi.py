@@ -22,7 +22,7 @@
 # SOFTWARE.
 
 import logging
-import requests
+from transport import UPLOAD_TIMEOUT, session
 from time import sleep
 
 logger = logging.getLogger(__name__)
@@ -42,8 +42,8 @@ class MastodonClient:
 
     def test_credentials(self):
         url = f"{self.__base_uri}/api/v1/accounts/verify_credentials"
-        response = requests.get(url, headers=self.__headers,
-                                timeout=TIMEOUT)
+        response = session.get(url, headers=self.__headers,
+                               timeout=TIMEOUT)
         if response.ok:
             return response.json()
         message = f"HTTP Code: {response.status_code}. {response.text}"
@@ -52,8 +52,8 @@ class MastodonClient:
     def send_message(self, message):
         url = f"{self.__base_uri}/api/v1/statuses"
         data = {"status": message}
-        response = requests.post(url, headers=self.__headers, json=data,
-                                 timeout=TIMEOUT)
+        response = session.post(url, headers=self.__headers, json=data,
+                                timeout=TIMEOUT)
         if response.ok:
             return response.json()
         message = f"HTTP Code: {response.status_code}. {response.text}"
@@ -64,8 +64,8 @@ class MastodonClient:
         try:
             data = {"status": status,
                     "media_ids": media_ids}
-            response = requests.post(url, headers=self.__headers, json=data,
-                                     timeout=TIMEOUT)
+            response = session.post(url, headers=self.__headers, json=data,
+                                    timeout=TIMEOUT)
             if response.status_code == 200:
                 return response.json()
             message = f"HTTP Code: {response.status_code}. {response.text}"
@@ -79,7 +79,8 @@ class MastodonClient:
         url = f"{self.__base_uri}/api/v2/media"
         try:
             files = {"file": open(filename, "rb")}
-            response = requests.post(url, headers=self.__headers, files=files)
+            response = session.post(url, headers=self.__headers, files=files,
+                                    timeout=UPLOAD_TIMEOUT)
             if response.status_code == 202:
                 return response.json()
             message = f"HTTP Code: {response.status_code}. {response.text}"
@@ -97,7 +98,8 @@ class MastodonClient:
                     "thumbnail": ('thumbnail.jpg', open(thumbnail, "rb"),
                                   'image/jpeg')
                     }
-            response = requests.post(url, headers=self.__headers, files=data)
+            response = session.post(url, headers=self.__headers, files=data,
+                                    timeout=UPLOAD_TIMEOUT)
             if response.status_code == 202:
                 return response.json()
             message = f"HTTP Code: {response.status_code}. {response.text}"
@@ -111,7 +113,7 @@ class MastodonClient:
         url = f"{self.__base_uri}/api/v1/media/{id}"
         print(url)
         try:
-            response = requests.get(url, headers=self.__headers)
+            response = session.get(url, headers=self.__headers)
             if response.status_code == 200:
                 return response.json()
             message = f"HTTP Code: {response.status_code}. {response.text}"
@@ -21,7 +21,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import requests
+from transport import session
 import sys
 import logging
 from urllib.parse import quote
@@ -52,8 +52,8 @@ class MatrixClient:
                 "msgtype": "m.text",
                 "body": text
             }
-            response = requests.put(self._url, headers=self._headers,
-                                    json=data)
+            response = session.put(self._url, headers=self._headers,
+                                   json=data)
             logger.debug("Status code: %s", response.status_code)
             logger.debug("Response: %s", response.text)
             if response.status_code == 200:
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from publication import Publication
+from ytdlman import VIDEO_FORMAT, YtDlMan
+
+CLIP_SECONDS = 45
+
+
+def video_key(yt_id):
+    return {"yt_id": yt_id, "kind": "video", "format": VIDEO_FORMAT}
+
+
+def clip_key(yt_id):
+    return {"yt_id": yt_id, "kind": "clip", "format": VIDEO_FORMAT,
+            "clip": [0, CLIP_SECONDS]}
+
+
+def fetch_media(cache, yt_id, directory, destinations, lease=None):
+    """Downloads what the pending media destinations need.
+
+    The whole video is only needed to export it to PeerTube, Twitter and
+    Mastodon only get the first CLIP_SECONDS, so if PeerTube is not in
+    destinations or already done only that clip is downloaded. Both are
+    kept in the media cache, so a retry does not download them again, and
+    the lease keeps them there while the job uses them.
+
+    :return: The report of the download and the path of the video, None
+    if only the clip was needed.
+    """
+    if "peertube" in destinations and \
+            not Publication.is_done(yt_id, "peertube"):
+        origen, report = cache.fetch(
+            video_key(yt_id), "origen.mp4",
+            lambda directory: YtDlMan.download(yt_id, directory), directory,
+            lease)
+    else:
+        origen = None
+        _, report = cache.fetch(
+            clip_key(yt_id), "destino.mp4",
+            lambda directory: YtDlMan.download_clip(yt_id, 0, CLIP_SECONDS,
+                                                    directory), directory,
+            lease)
+    return report or {"yt_id": yt_id, "cached": True}, origen
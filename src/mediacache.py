@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class Lease:
+    """The cached files a job uses, not evicted until it is released."""
+
+    def __init__(self, cache):
+        self._cache = cache
+        self.paths = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._cache.release(self)
+        return False
+
+
+class MediaCache:
+    """Files of the videos by what they are, shared by every job.
+
+    The key of a file is what it is made of, like the id of the video,
+    the format and the clip window, so a retry, a repeated run or another
+    destination that needs the same file finds it done. Only the files
+    used last are kept, up to size bytes, the others are removed unless a
+    lease is using them.
+    """
+
+    def __init__(self, root=None, size=None):
+        self._root = root or os.getenv("MEDIA_CACHE_ROOT",
+                                       "/tmp/pyblisher-cache")
+        self._size = int(os.getenv("MEDIA_CACHE_SIZE", 10 * 1024 ** 3)) \
+            if size is None else size
+        self._lock = threading.Lock()
+        # the lock of every key being produced and how many wait for it
+        self._producing = {}
+        self._pins = Counter()
+
+    @staticmethod
+    def digest(key):
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode())\
+            .hexdigest()
+
+    def path(self, key, extension):
+        digest = self.digest(key)
+        return os.path.join(self._root, digest[:2], f"{digest}{extension}")
+
+    def get(self, key, extension, lease=None):
+        """Returns the path of the file, or None if it is not cached.
+
+        :param lease: If given, the file is not evicted until the lease is
+        released.
+        """
+        path = self.path(key, extension)
+        with self._lock:
+            try:
+                # the mtime is the last use
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+            self._pin(path, lease)
+        return path
+
+    def fetch(self, key, filename, produce, directory, lease=None):
+        """Returns the path of the file, producing it if needed.
+
+        :param key: What the file is made of, anything json can dump.
+        :param filename: The name of the file that produce creates.
+        :param produce: Called with directory when the file is not cached,
+        it creates the file there. Its result is returned.
+        :param directory: A scratch directory, as the workspace of a job.
+        :param lease: If given, the file is not evicted until the lease is
+        released.
+        :return: The path of the file in the cache and the result of
+        produce, None if it was cached.
+        """
+        extension = os.path.splitext(filename)[1]
+        digest = self.digest(key)
+        with self._lock:
+            producing = self._producing.setdefault(
+                digest, [threading.Lock(), 0])
+            producing[1] += 1
+        try:
+            # the same file is only produced once at a time
+            with producing[0]:
+                path = self.get(key, extension, lease)
+                if path:
+                    logger.info(f"Cached {key}")
+                    return path, None
+                result = produce(directory)
+                path = self.put(key, os.path.join(directory, filename),
+                                lease)
+            return path, result
+        finally:
+            with self._lock:
+                producing[1] -= 1
+                if producing[1] == 0:
+                    del self._producing[digest]
+
+    def put(self, key, source, lease=None):
+        """Moves the file source to the cache and returns its path."""
+        path = self.path(key, os.path.splitext(source)[1])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        shutil.move(source, temporary)
+        with self._lock:
+            os.replace(temporary, path)
+            self._pin(path, lease)
+        self.evict(keep=path)
+        return path
+
+    def lease(self):
+        """Returns a lease, to be used in a with statement."""
+        return Lease(self)
+
+    def release(self, lease):
+        """Lets the files of the lease be evicted again."""
+        with self._lock:
+            self._pins.subtract(lease.paths)
+            for path in lease.paths:
+                if self._pins[path] <= 0:
+                    del self._pins[path]
+            lease.paths = []
+
+    def _pin(self, path, lease):
+        if lease is not None:
+            self._pins[path] += 1
+            lease.paths.append(path)
+
+    def files(self):
+        """The (mtime, size, path) of the cached files."""
+        files = []
+        for root, _, names in os.walk(self._root):
+            for name in names:
+                path = os.path.join(root, name)
+                if path.endswith(".tmp"):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def evict(self, keep=None):
+        """Removes the files used least recently beyond the size, but
+        keep and the ones leased."""
+        files = sorted(self.files(), reverse=True)
+        with self._lock:
+            usage = sum(size for _, size, path in files
+                        if path == keep or path in self._pins)
+            for _, size, path in files:
+                if path == keep or path in self._pins:
+                    continue
+                usage += size
+                if usage > self._size:
+                    logger.info(f"Evict {path}")
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    """Serialized pages of a table with their ETag.
+
+    A page is kept until the revision of its table changes, and only the
+    last `size` pages are kept.
+    """
+
+    def __init__(self, size=128):
+        self._size = size
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, revision, build):
+        """Returns the page, building it if it is not cached or is old.
+
+        :param key: The key of the page, hashable.
+        :param revision: The revision of the table.
+        :param build: The function that returns the content of the page,
+        anything json can dump, and the headers to send with it.
+        :return: The ETag, the body as bytes and the headers.
+        """
+        with self._lock:
+            page = self._pages.get(key)
+            if page and page[0] == revision:
+                self._pages.move_to_end(key)
+                return page[1:]
+        content, headers = build()
+        body = json.dumps(content, separators=(",", ":")).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        with self._lock:
+            self._pages[key] = (revision, etag, body, headers)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self._size:
+                self._pages.popitem(last=False)
+        return etag, body, headers
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    @staticmethod
+    def matches(etag, if_none_match):
+        """True if the If-None-Match header matches the ETag."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
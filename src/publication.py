@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+import time
+from table import Table
+
+logger = logging.getLogger(__name__)
+
+
+class Publication(Table):
+    __slots__ = ()
+    TABLE = 'PUBLICATIONS'
+    UNIKEYS = ['yt_id', 'destination']
+    CREATE_TABLE_QUERY = (f"CREATE TABLE IF NOT EXISTS {TABLE}("
+                          "ID INTEGER PRIMARY KEY AUTOINCREMENT,"
+                          "YT_ID TEXT,"
+                          "DESTINATION TEXT,"
+                          "STATUS TEXT,"
+                          "REMOTE_ID TEXT,"
+                          "LATENCY_MS INTEGER,"
+                          "UPDATED_AT INTEGER)")
+    MIGRATIONS = [
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {TABLE}_YT_ID_DESTINATION "
+        f"ON {TABLE}(yt_id, destination)",
+    ]
+    DONE = 'done'
+    FAILED = 'failed'
+
+    @classmethod
+    def find_by_destination(cls, yt_id, destination):
+        """
+        Finds the publication of a video in a destination.
+
+        :param yt_id: The YouTube ID of the video.
+        :param destination: The name of the destination.
+        :return: A Publication object, or None if not found.
+        """
+        return cls.find(yt_id=yt_id, destination=destination).first()
+
+    @classmethod
+    def is_done(cls, yt_id, destination):
+        publication = cls.find_by_destination(yt_id, destination)
+        return publication is not None and publication.status == cls.DONE
+
+    @classmethod
+    def record(cls, yt_id, destination, status, remote_id=None,
+               latency_ms=None):
+        """
+        Creates or updates the publication of a video in a destination.
+
+        :return: The saved Publication object.
+        """
+        publication = cls.find_by_destination(yt_id, destination)
+        if publication is None:
+            publication = cls.from_dict({"yt_id": yt_id,
+                                         "destination": destination})
+        publication.status = status
+        publication.remote_id = remote_id
+        publication.latency_ms = latency_ms
+        publication.updated_at = int(time.time())
+        publication.save()
+        return publication
+
+    @classmethod
+    def run(cls, yt_id, destination, function, *args):
+        """
+        Publishes a video in a destination unless it is already done.
+
+        `function` is called with `args` and what it returns is saved as
+        the remote id. If it raises, or returns None because the client
+        swallowed the error, the publication is recorded as failed and an
+        exception is raised.
+
+        :return: True if the function was called, False if it was skipped.
+        """
+        if cls.is_done(yt_id, destination):
+            logger.info("%s already published in %s", yt_id, destination)
+            return False
+        start = time.monotonic()
+        try:
+            remote_id = function(*args)
+        except Exception:
+            latency_ms = int((time.monotonic() - start) * 1000)
+            cls.record(yt_id, destination, cls.FAILED, latency_ms=latency_ms)
+            raise
+        latency_ms = int((time.monotonic() - start) * 1000)
+        if remote_id is None:
+            cls.record(yt_id, destination, cls.FAILED, latency_ms=latency_ms)
+            raise Exception(f"Can not publish {yt_id} in {destination}")
+        cls.record(yt_id, destination, cls.DONE, str(remote_id), latency_ms)
+        return True
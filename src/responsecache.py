@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from table import Table
+from transport import session
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(Table):
+    __slots__ = ()
+    TABLE = 'RESPONSES'
+    UNIKEYS = ['url']
+    CREATE_TABLE_QUERY = (f"CREATE TABLE IF NOT EXISTS {TABLE}("
+                          "ID INTEGER PRIMARY KEY AUTOINCREMENT,"
+                          "URL TEXT,"
+                          "ETAG TEXT,"
+                          "BODY TEXT,"
+                          "FETCHED_AT INTEGER,"
+                          "USED_AT INTEGER)")
+    MIGRATIONS = [
+        [f"CREATE UNIQUE INDEX IF NOT EXISTS {TABLE}_URL ON {TABLE}(url)",
+         f"CREATE INDEX IF NOT EXISTS {TABLE}_USED_AT ON {TABLE}(used_at)"],
+    ]
+
+    @classmethod
+    def evict(cls, size):
+        """Deletes the responses but the `size` used last."""
+        cls.raw_execute(f"DELETE FROM {cls.TABLE} WHERE id NOT IN ("
+                        f"SELECT id FROM {cls.TABLE} "
+                        "ORDER BY used_at DESC LIMIT ?)", [size])
+
+
+class ResponseCache:
+    """On disk cache of the JSON responses of an HTTP API.
+
+    A response younger than `ttl` seconds is returned without any request.
+    An older one is requested again with its ETag in If-None-Match, so if
+    it did not change the API answers 304 without body. Only the `size`
+    responses used last are kept on disk, and the data of the last
+    `memory` ones is also kept parsed, so a 304 does not parse anything.
+
+    CachedResponse has to be initialized before using it.
+    """
+
+    def __init__(self, ttl=None, size=None, memory=128):
+        self._ttl = int(os.getenv("HTTP_CACHE_TTL", 60)) \
+            if ttl is None else ttl
+        self._size = int(os.getenv("HTTP_CACHE_SIZE", 1000)) \
+            if size is None else size
+        self._memory = memory
+        self._parsed = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, params):
+        """The url with the params, but the key of the API, sorted."""
+        params = sorted((name, value) for name, value in params.items()
+                        if name != "key")
+        return f"{url}?{urlencode(params)}"
+
+    def get(self, url, params):
+        """Returns the data of the response, or None if it failed."""
+        key = self.key(url, params)
+        now = int(time.time())
+        cached = CachedResponse.find(url=key).first()
+        if cached and now - (cached.fetched_at or 0) < self._ttl:
+            logger.debug(f"Fresh {key}")
+            return self.__use(cached, now)
+        headers = {"If-None-Match": cached.etag} \
+            if cached and cached.etag else {}
+        response = session.get(url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            logger.debug(f"Not modified {key}")
+            cached.fetched_at = now
+            return self.__use(cached, now)
+        if response.status_code != 200:
+            logger.error(response.status_code)
+            logger.error(response.text)
+            return None
+        data = response.json()
+        inserted = cached is None
+        if inserted:
+            cached = CachedResponse.from_dict({"url": key})
+        cached.etag = response.headers.get("ETag")
+        cached.body = response.text
+        cached.fetched_at = now
+        cached.used_at = now
+        cached.save()
+        self.__remember(cached, data)
+        if inserted:
+            CachedResponse.evict(self._size)
+        return data
+
+    def __use(self, cached, now):
+        cached.used_at = now
+        cached.save()
+        with self._lock:
+            parsed = self._parsed.get(cached.url)
+            if parsed and parsed[0] == cached.etag:
+                self._parsed.move_to_end(cached.url)
+                return parsed[1]
+        data = json.loads(cached.body)
+        self.__remember(cached, data)
+        return data
+
+    def __remember(self, cached, data):
+        with self._lock:
+            self._parsed[cached.url] = (cached.etag, data)
+            self._parsed.move_to_end(cached.url)
+            while len(self._parsed) > self._memory:
+                self._parsed.popitem(last=False)
@@ -21,12 +21,72 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import atexit
+import keyword
+import os
 import sqlite3
+import threading
 from collections import OrderedDict
 import logging
 
 logger = logging.getLogger(__name__)
 
+CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
+FETCH_SIZE = int(os.getenv("SQLITE_FETCH_SIZE", "500"))
+PRAGMAS = [
+    f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')}",
+    f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+    f"PRAGMA cache_size={os.getenv('SQLITE_CACHE_SIZE', '-16000')}",
+    f"PRAGMA mmap_size={os.getenv('SQLITE_MMAP_SIZE', '268435456')}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+]
+
+
+class Connections:
+    """One SQLite connection by thread and database file.
+
+    The connections are opened on first use, tuned with `PRAGMAS` and kept
+    open, so every statement reuses the connection and its cache of
+    prepared statements.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+
+    def get(self, database):
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(database)
+        if conn is None:
+            conn = sqlite3.connect(database,
+                                   cached_statements=CACHED_STATEMENTS,
+                                   check_same_thread=False)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            connections[database] = conn
+            with self._lock:
+                self._all.append((connections, database, conn))
+        return conn
+
+    def close(self):
+        """Closes every connection of every thread."""
+        with self._lock:
+            items, self._all = self._all, []
+        for connections, database, conn in items:
+            connections.pop(database, None)
+            try:
+                conn.close()
+            except Exception as exception:
+                logger.error(exception)
+
+
+connections = Connections()
+atexit.register(connections.close)
+
 
 class NoUnikeys(Exception):
     def __init__(self):
@@ -34,12 +94,172 @@ class NoUnikeys(Exception):
         super().__init__(message)
 
 
+class InvalidQuery(Exception):
+    pass
+
+
+class Condition:
+    """A condition of a WHERE clause whose value is always bound."""
+    OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'LIKE', 'IN', 'NOT IN',
+                 'IS NULL', 'IS NOT NULL')
+
+    def __init__(self, column, operator='=', value=None):
+        operator = operator.upper()
+        if operator not in self.OPERATORS:
+            raise InvalidQuery(f"Invalid operator {operator}")
+        if operator in ('IN', 'NOT IN'):
+            value = list(value)
+            if not value:
+                raise InvalidQuery(f"Empty {operator} for {column}")
+        self.column = column.lower()
+        self.operator = operator
+        self.value = value
+
+    def shape(self):
+        if self.operator in ('IN', 'NOT IN'):
+            return (self.column, self.operator, len(self.value))
+        return (self.column, self.operator)
+
+    def sql(self):
+        if self.operator in ('IS NULL', 'IS NOT NULL'):
+            return f"{self.column} {self.operator}", []
+        if self.operator in ('IN', 'NOT IN'):
+            marks = ",".join("?" * len(self.value))
+            return f"{self.column} {self.operator} ({marks})", self.value
+        return f"{self.column} {self.operator} ?", [self.value]
+
+
+class Query:
+    """Builds a SELECT over a Table with bound parameters.
+
+    The SQL only depends on the shape of the query (columns, operators,
+    ordering and whether there is a limit or offset), never on the values,
+    so it is built once and SQLite reuses the prepared statement.
+    """
+    _cache = {}
+
+    def __init__(self, table):
+        self._table = table
+        self._conditions = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+
+    def where(self, column, operator='=', value=None):
+        self._check(column)
+        self._conditions.append(Condition(column, operator, value))
+        return self
+
+    def order_by(self, column, descending=False):
+        self._check(column)
+        self._order.append((column.lower(), descending))
+        return self
+
+    def limit(self, limit):
+        self._limit = int(limit)
+        return self
+
+    def offset(self, offset):
+        self._offset = int(offset)
+        return self
+
+    def _check(self, column):
+        if column.lower() not in self._table.COLUMNS:
+            raise InvalidQuery(f"Unknown column {column} in "
+                               f"{self._table.TABLE}")
+
+    def build(self, kind='select'):
+        """Returns the SQL and the parameters of the query.
+
+        Args:
+            kind (str): select, count or exists
+        """
+        key = (self._table.TABLE, kind,
+               tuple(condition.shape() for condition in self._conditions),
+               tuple(self._order), self._limit is not None,
+               self._offset is not None)
+        sqlquery = self._cache.get(key)
+        params = []
+        for condition in self._conditions:
+            params.extend(condition.sql()[1])
+        if sqlquery is None:
+            if kind == 'count':
+                sqlquery = f"SELECT COUNT(*) FROM {self._table.TABLE}"
+            elif kind == 'exists':
+                sqlquery = f"SELECT 1 FROM {self._table.TABLE}"
+            else:
+                columns = ','.join(self._table.COLUMNS)
+                sqlquery = f"SELECT {columns} FROM {self._table.TABLE}"
+            if self._conditions:
+                sqlquery += " WHERE " + " AND ".join(
+                    condition.sql()[0] for condition in self._conditions)
+            if self._order:
+                sqlquery += " ORDER BY " + ", ".join(
+                    f"{column} DESC" if descending else column
+                    for column, descending in self._order)
+            if self._limit is not None or self._offset is not None:
+                sqlquery += " LIMIT ?"
+            if self._offset is not None:
+                sqlquery += " OFFSET ?"
+            self._cache[key] = sqlquery
+        if self._limit is not None or self._offset is not None:
+            params.append(self._limit if self._limit is not None else -1)
+        if self._offset is not None:
+            params.append(self._offset)
+        return sqlquery, params
+
+    def all(self):
+        sqlquery, params = self.build()
+        return self._table.from_rows(self._table.raw_query(sqlquery, params))
+
+    def iter(self, size=FETCH_SIZE):
+        """Yields the items while it reads them `size` rows at a time."""
+        sqlquery, params = self.build()
+        for row in self._table.raw_iter_query(sqlquery, params, size):
+            yield self._table.from_list(row)
+
+    def first(self):
+        previous = self._limit
+        self._limit = 1
+        try:
+            items = self.all()
+        finally:
+            self._limit = previous
+        return items[0] if items else None
+
+    def count(self):
+        sqlquery, params = self.build('count')
+        result = self._table.raw_query(sqlquery, params)
+        return result[0][0] if result else 0
+
+    def exists(self):
+        if self._limit is None:
+            self._limit = 1
+        sqlquery, params = self.build('exists')
+        return len(self._table.raw_query(sqlquery, params)) > 0
+
+
+CONVERTERS = {'INTEGER': int, 'TEXT': str, 'BOOLEAN': bool}
+
+
 class Table:
+    # subclasses should also declare an empty __slots__, so the row class
+    # built by inicializate has no __dict__
+    __slots__ = ()
     DATABASE = '/app/database/database.db'
     TABLE = 'TABLE'
     CREATE_TABLE_QUERY = ''
     UNIKEYS = []
     COLUMNS = {}
+    # every item is a SQL statement or a list of them, its version is the
+    # position in the list starting at 1. Never change or remove one.
+    MIGRATIONS = []
+    _CONVERTERS = {}
+    _FROM_ROWS = None
+
+    def __new__(cls, *args, **kwargs):
+        # instances of a table are instances of its row class
+        return object.__new__(cls.__dict__.get('_ROW_CLASS', cls))
 
     def __init__(self):
         for column in self.COLUMNS:
@@ -48,45 +268,150 @@ class Table:
     @classmethod
     def inicializate(cls):
         cls.__execute(cls.CREATE_TABLE_QUERY)
+        cls.__migrate()
         cls.COLUMNS = cls.__get_columns()
+        cls.__build_row_class()
+
+    @classmethod
+    def __build_row_class(cls):
+        """Builds the class of the rows of the table.
+
+        It is a subclass with a slot for every column, so the rows are
+        compact, and it precompiles the converter of every column and the
+        function used by from_list and from_rows, that unpacks every row in
+        the slots with a single statement.
+        """
+        columns = tuple(cls.COLUMNS)
+        row_class = type(cls.__name__, (cls,), {
+            '__slots__': columns,
+            '__module__': cls.__module__,
+            '__qualname__': cls.__qualname__})
+        cls._ROW_CLASS = row_class
+        cls._CONVERTERS = {column: CONVERTERS.get(value['data_type'])
+                           for column, value in cls.COLUMNS.items()}
+        cls._FROM_ROWS = None
+        if not all(column.isidentifier() and not keyword.iskeyword(column)
+                   for column in columns):
+            return
+        # the unpacking raises ValueError if a row does not fit the columns
+        targets = "".join(f"item.{column}, " for column in columns)
+        source = ("def from_rows(rows):\n"
+                  "    items = []\n"
+                  "    append = items.append\n"
+                  "    for row in rows:\n"
+                  "        item = new(row_class)\n"
+                  f"        {targets}= row\n"
+                  "        append(item)\n"
+                  "    return items\n")
+        namespace = {"new": object.__new__, "row_class": row_class}
+        exec(source, namespace)
+        cls._FROM_ROWS = staticmethod(namespace["from_rows"])
+
+    @classmethod
+    def get_schema_version(cls):
+        result = cls.__select("SELECT version FROM SCHEMA_MIGRATIONS "
+                              "WHERE table_name=?", [cls.TABLE])
+        return result[0][0] if result else 0
+
+    @classmethod
+    def __migrate(cls):
+        """Applies the pending MIGRATIONS, each one in its own transaction.
+
+        The applied version of every table is stored in SCHEMA_MIGRATIONS.
+        """
+        if not cls.MIGRATIONS:
+            return
+        cls.__execute("CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATIONS("
+                      "TABLE_NAME TEXT PRIMARY KEY,"
+                      "VERSION INTEGER)")
+        version = cls.get_schema_version()
+        conn = connections.get(cls.DATABASE)
+        for number, migration in enumerate(cls.MIGRATIONS[version:],
+                                           start=version + 1):
+            statements = [migration] if isinstance(migration, str) \
+                else migration
+            logger.info("Migrate %s to version %s", cls.TABLE, number)
+            try:
+                conn.execute("BEGIN")
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute("INSERT INTO SCHEMA_MIGRATIONS "
+                             "(table_name, version) VALUES (?, ?) "
+                             "ON CONFLICT(table_name) DO UPDATE "
+                             "SET version=excluded.version",
+                             [cls.TABLE, number])
+                conn.commit()
+            except Exception as exception:
+                conn.rollback()
+                logger.error("Migration %s of %s failed: %s", number,
+                             cls.TABLE, exception)
+                raise
+
+    @classmethod
+    def close_connections(cls):
+        connections.close()
 
     @classmethod
     def __execute(cls, sqlquery, data=None):
         lastrowid = None
         conn = None
         try:
-            conn = sqlite3.connect(cls.DATABASE)
-            cursor = conn.cursor()
-            logger.info(sqlquery)
+            conn = connections.get(cls.DATABASE)
+            logger.debug(sqlquery)
             if data:
-                lastrowid = cursor.execute(sqlquery, data).lastrowid
+                lastrowid = conn.execute(sqlquery, data).lastrowid
             else:
-                lastrowid = cursor.execute(sqlquery).lastrowid
+                lastrowid = conn.execute(sqlquery).lastrowid
             conn.commit()
         except Exception as exception:
             logger.error(exception)
-            lastrowid = None
-        finally:
             if conn:
-                conn.close()
+                conn.rollback()
+            lastrowid = None
         return lastrowid
 
     @classmethod
-    def __select(cls, sqlquery):
+    def __executemany(cls, sqlquery, rows):
         conn = None
         try:
-            conn = sqlite3.connect(cls.DATABASE)
-            cursor = conn.cursor()
-            logger.info(sqlquery)
-            cursor.execute(sqlquery)
-            return cursor.fetchall()
+            conn = connections.get(cls.DATABASE)
+            logger.debug(sqlquery)
+            with conn:
+                return conn.executemany(sqlquery, rows).rowcount
+        except Exception as exception:
+            logger.error(exception)
+        return 0
+
+    @classmethod
+    def __select(cls, sqlquery, data=None):
+        try:
+            conn = connections.get(cls.DATABASE)
+            logger.debug(sqlquery)
+            if data:
+                return conn.execute(sqlquery, data).fetchall()
+            return conn.execute(sqlquery).fetchall()
         except Exception as exception:
             logger.error(exception)
-        finally:
-            if conn:
-                conn.close()
         return []
 
+    @classmethod
+    def __iter_select(cls, sqlquery, data=None, size=FETCH_SIZE):
+        try:
+            conn = connections.get(cls.DATABASE)
+            logger.debug(sqlquery)
+            cursor = conn.execute(sqlquery, data or [])
+        except Exception as exception:
+            logger.error(exception)
+            return
+        try:
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
     @classmethod
     def __get_columns(cls):
         columns = {}
@@ -107,24 +432,17 @@ class Table:
             value (_type_): _description_
         """
         if value:
-            if self.COLUMNS[column]['data_type'] == 'INTEGER':
-                value = int(value) if value else None
-            elif self.COLUMNS[column]['data_type'] == 'TEXT':
-                value = str(value) if value else None
-            elif self.COLUMNS[column]['data_type'] == 'BOOLEAN':
-                value = bool(value) if value else None
+            convert = self._CONVERTERS[column]
+            if convert:
+                value = convert(value)
         setattr(self, column, value)
 
     def get(self, column):
-
         value = getattr(self, column)
         if value:
-            if self.COLUMNS[column]['data_type'] == 'INTEGER':
-                return int(value)
-            elif self.COLUMNS[column]['data_type'] == 'TEXT':
-                return str(value)
-            elif self.COLUMNS[column]['data_type'] == 'BOOLEAN':
-                return bool(value)
+            convert = self._CONVERTERS[column]
+            if convert:
+                return convert(value)
         return value
 
     @classmethod
@@ -137,10 +455,19 @@ class Table:
 
     @classmethod
     def from_list(cls, result):
-        item = cls()
-        for index, column in enumerate(cls.COLUMNS):
-            setattr(item, column, result[index])
-        return item
+        if cls._FROM_ROWS is None:
+            item = cls()
+            for column, value in zip(cls.COLUMNS, result, strict=True):
+                setattr(item, column, value)
+            return item
+        return cls._FROM_ROWS((result,))[0]
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Same as calling from_list for every row, but faster."""
+        if cls._FROM_ROWS is None:
+            return [cls.from_list(row) for row in rows]
+        return cls._FROM_ROWS(rows)
 
     def save(self):
         keys = list(self.COLUMNS.keys())
@@ -155,30 +482,66 @@ class Table:
             self.__execute(sqlquery, data)
         else:
             set_values = ",".join(keys)
-            print(keys)
             set_data = ("?,"*len(keys))[:-1]
             sqlquery = "INSERT INTO {} ({}) VALUES ({})".format(
                     self.TABLE, set_values, set_data)
             data = [self.get(key) for key in keys]
             self.set(pk, self.__execute(sqlquery, data))
 
+    @classmethod
+    def bulk_insert(cls, items, upsert=True):
+        """
+        Inserts many rows in one transaction.
+
+        Every item is a dict or a row object. When upsert is True and the
+        table has UNIKEYS, a row whose unique keys already exist updates
+        the other columns instead of failing. It needs a UNIQUE index on
+        the UNIKEYS.
+
+        :return: The number of rows inserted or updated.
+        """
+        keys = [key for key in cls.COLUMNS if key != cls.get_pk()]
+        sqlquery = "INSERT INTO {} ({}) VALUES ({})".format(
+                cls.TABLE, ",".join(keys), ",".join("?" * len(keys)))
+        if upsert and cls.UNIKEYS:
+            updates = [key for key in keys if key not in cls.UNIKEYS]
+            action = "DO UPDATE SET " + ",".join(
+                f"{key}=excluded.{key}" for key in updates) \
+                if updates else "DO NOTHING"
+            sqlquery += f" ON CONFLICT({','.join(cls.UNIKEYS)}) {action}"
+        # dicts and rows both have get
+        rows = ([item.get(key) for key in keys] for item in items)
+        return cls.__executemany(sqlquery, rows)
+
     def exists(self):
         if self.UNIKEYS:
-            condition = []
-            for key in self.UNIKEYS:
-                value = self.get(key)
-                condition.append(f"{key}='{value}'")
-            strcondition = ' and '.join(condition)
-            items = self.select(strcondition)
-            return len(items) > 0
+            return self.find(**{key: self.get(key)
+                                for key in self.UNIKEYS}).exists()
         raise NoUnikeys
 
     @classmethod
     def get_by_id(cls, id):
-        pk = cls.get_pk()
-        condition = f"{pk}='{id}'"
-        items = cls.select(condition)
-        return items[0] if len(items) > 0 else None
+        return cls.find(**{cls.get_pk(): id}).first()
+
+    @classmethod
+    def find(cls, **conditions):
+        """
+        Returns a Query over the table.
+
+        Every keyword is an equality condition (IS NULL for None) and more
+        conditions, ordering, limit and offset can be chained:
+
+            Video.find(yt_id=yt_id).first()
+            (Video.find().where("published_at", ">", date)
+             .order_by("published_at", descending=True).limit(10).all())
+        """
+        query = Query(cls)
+        for column, value in conditions.items():
+            if value is None:
+                query.where(column, 'IS NULL')
+            else:
+                query.where(column, '=', value)
+        return query
 
     @classmethod
     def get_all(cls):
@@ -192,7 +555,7 @@ class Table:
         return None
 
     @classmethod
-    def select(cls, condition=None):
+    def __select_query(cls, condition=None, limit=None):
         columns = ','.join(cls.COLUMNS)
         sqlquery = f"SELECT {columns} FROM {cls.TABLE}"
         if condition:
@@ -202,26 +565,55 @@ class Table:
                 else:
                     condition = condition[0]
             sqlquery += f" WHERE {condition}"
-        items = []
-        result = cls.__select(sqlquery)
-        if result:
-            for item in result:
-                items.append(cls.from_list(item))
-        return items
+        if limit is not None:
+            sqlquery += f" LIMIT {int(limit)}"
+        return sqlquery
+
+    @classmethod
+    def select(cls, condition=None, data=None, limit=None):
+        result = cls.__select(cls.__select_query(condition, limit), data)
+        return cls.from_rows(result) if result else []
+
+    @classmethod
+    def first(cls, condition=None, data=None):
+        """
+        Returns the first item that matches the condition, or None.
+
+        Only one row is read from the database, so the condition can end
+        with an ORDER BY but not with a LIMIT.
+        """
+        items = cls.select(condition, data, limit=1)
+        return items[0] if items else None
+
+    @classmethod
+    def iter_select(cls, condition=None, data=None, size=FETCH_SIZE):
+        """
+        Same as select, but yields the items one by one while it reads the
+        rows from the database `size` rows at a time.
+        """
+        for row in cls.__iter_select(cls.__select_query(condition), data,
+                                     size):
+            yield cls.from_list(row)
 
     @classmethod
     def query(cls, sqlquery):
         return cls.select(sqlquery)
 
     @classmethod
-    def raw_query(cls, sqlquery):
-        return cls.__select(sqlquery)
+    def raw_query(cls, sqlquery, data=None):
+        return cls.__select(sqlquery, data)
+
+    @classmethod
+    def raw_iter_query(cls, sqlquery, data=None, size=FETCH_SIZE):
+        return cls.__iter_select(sqlquery, data, size)
+
+    @classmethod
+    def raw_execute(cls, sqlquery, data=None):
+        """Executes and commits a statement that returns no rows."""
+        return cls.__execute(sqlquery, data)
 
     def serialize(self):
-        result = {}
-        for column in self.COLUMNS:
-            result[column] = self.get(column)
-        return result
+        return dict(self)
 
     def __repr__(self):
         name = type(self).__name__
@@ -230,15 +622,12 @@ class Table:
         return f'<{name} {id}>'
 
     def __iter__(self):
-        for column in self.COLUMNS:
-            yield(column, self.get(column))
+        for column, convert in self._CONVERTERS.items():
+            value = getattr(self, column)
+            yield (column, convert(value) if value and convert else value)
 
     def __str__(self):
-        result = []
-        for column in self.COLUMNS:
-            value = self.get(column)
-            result.append(f"{column}: {value}")
-        return "\n".join(result)
+        return "\n".join(f"{column}: {value}" for column, value in self)
 
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
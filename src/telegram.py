@@ -1,5 +1,5 @@
 import logging
-import requests
+from transport import session
 
 
 logger = logging.getLogger(__name__)
@@ -22,9 +22,10 @@ class Telegram:
             "text": message
         }
         url = f"{self._base_url}/sendMessage"
-        response = requests.post(url, data=payload, timeout=TIMEOUT)
+        response = session.post(url, data=payload, timeout=TIMEOUT)
         if not response.ok:
             raise TelegramException(f"Error: {response.text}")
+        return response.json()
 
     def send_video(self, message: str, filename: str, chat_id, thread_id=None):
         logger.info("send_video: %s", message)
@@ -35,7 +36,7 @@ class Telegram:
         }
         url = f"{self._base_url}/sendVideo"
         with open(filename, "rb") as fr:
-            response = requests.post(url, data=payload, files={"video": fr},
-                                     timeout=TIMEOUT)
+            response = session.post(url, data=payload, files={"video": fr},
+                                    timeout=TIMEOUT)
             if not response.ok:
                 raise TelegramException(f"Error: {response.text}")
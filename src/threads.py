@@ -1,6 +1,6 @@
 import json
 import logging
-import requests
+from transport import session
 
 
 logger = logging.getLogger(__name__)
@@ -35,7 +35,7 @@ class Threads:
             "access_token": self._config["access_token"]
         }
         url = f"{BASE_URL}/refresh_access_token"
-        response = requests.get(url, params=params, timeout=TIMEOUT)
+        response = session.get(url, params=params, timeout=TIMEOUT)
         if response.status_code != 200:
             raise ThreadsException(f"Error: {response.text}")
         self._config["access_token"] = response.json()["access_token"]
@@ -49,7 +49,7 @@ class Threads:
                        "threads_biography")
         }
         url = f"{BASE_URL}/v1.0/{self._config['user_id']}"
-        response = requests.get(url, params=params, timeout=TIMEOUT)
+        response = session.get(url, params=params, timeout=TIMEOUT)
         if response.status_code != 200:
             raise ThreadsException(f"Error: {response.text}")
         return response.json()
@@ -61,7 +61,7 @@ class Threads:
             "access_token": self._config["access_token"]
         }
         url = f"{BASE_URL}/v1.0/{self._config['user_id']}/threads_publish"
-        response = requests.post(url, data=data, timeout=TIMEOUT)
+        response = session.post(url, data=data, timeout=TIMEOUT)
         if response.status_code != 200:
             raise ThreadsException(f"Error: {response.text}")
         return response.json()
@@ -75,7 +75,7 @@ class Threads:
             "access_token": self._config["access_token"]
         }
         url = f"{BASE_URL}/v1.0/{self._config['user_id']}/threads"
-        response = requests.post(url, data=data, timeout=TIMEOUT)
+        response = session.post(url, data=data, timeout=TIMEOUT)
         if response.status_code != 200:
             raise ThreadsException(f"Error: {response.text}")
         id = response.json()["id"]
@@ -91,7 +91,7 @@ class Threads:
             "access_token": self._config["access_token"]
         }
         url = f"{BASE_URL}/v1.0/{self._config['user_id']}/threads"
-        response = requests.post(url, data=data, timeout=TIMEOUT)
+        response = session.post(url, data=data, timeout=TIMEOUT)
         if response.status_code != 200:
             raise ThreadsException(f"Error: {response.text}")
         id = response.json()["id"]
@@ -107,7 +107,7 @@ class Threads:
             "access_token": self._config["access_token"]
         }
         url = f"{BASE_URL}/v1.0/{self._config['user_id']}/threads"
-        response = requests.post(url, data=data, timeout=TIMEOUT)
+        response = session.post(url, data=data, timeout=TIMEOUT)
         if response.status_code != 200:
             raise ThreadsException(f"Error: {response.text}")
         logger.debug(response.text)
@@ -122,7 +122,7 @@ class Threads:
             "access_token": self._config["access_token"]
         }
         url = f"{BASE_URL}/v1.0/{id}"
-        response = requests.get(url, params=params, timeout=TIMEOUT)
+        response = session.get(url, params=params, timeout=TIMEOUT)
         if response.status_code != 200:
             raise ThreadsException(f"Error: {response.text}")
         return response.json()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+import os
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "16"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "8"))
+TIMEOUT = (float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+           float(os.getenv("HTTP_READ_TIMEOUT", "60")))
+UPLOAD_TIMEOUT = (TIMEOUT[0],
+                  float(os.getenv("HTTP_UPLOAD_TIMEOUT", "1800")))
+
+
+class Session(requests.Session):
+    """A requests Session with per-host keep-alive pools.
+
+    `pool_connections` is the number of hosts whose pool is kept alive and
+    `pool_maxsize` the number of connections kept alive for each host. Any
+    request without an explicit timeout gets the default one.
+    """
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE, timeout=TIMEOUT):
+        super().__init__()
+        self._timeout = timeout
+        self._adapter = HTTPAdapter(pool_connections=pool_connections,
+                                    pool_maxsize=pool_maxsize)
+        self.mount("https://", self._adapter)
+        self.mount("http://", self._adapter)
+        self._lock = threading.Lock()
+        self._requests = Counter()
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self._timeout
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._requests[host] += 1
+        return super().request(method, url, **kwargs)
+
+    def stats(self):
+        """Returns the connection reuse statistics by host.
+
+        `connections` and `reused` only count the pools that are still
+        alive, `requests` counts every request since the start.
+        """
+        hosts = {}
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[pool.host] = {
+                "connections": pool.num_connections,
+                "reused": max(0, pool.num_requests - pool.num_connections)}
+        with self._lock:
+            requests_by_host = dict(self._requests)
+        for host, count in requests_by_host.items():
+            name = urlsplit(f"//{host}").hostname
+            item = hosts.setdefault(name, {"connections": 0, "reused": 0})
+            item["requests"] = item.get("requests", 0) + count
+        return hosts
+
+
+session = Session()
+
+
+def stats():
+    return session.stats()
@@ -22,7 +22,7 @@
 # SOFTWARE.
 
 import os
-import requests
+from transport import UPLOAD_TIMEOUT, session
 import sys
 import time
 import urllib.parse
@@ -98,7 +98,7 @@ class Twitter:
             "redirect_uri": self._redirect_uri,
             "code_verifier": "challenge"
             }
-        response = requests.post(url, data=payload, headers=headers)
+        response = session.post(url, data=payload, headers=headers)
         if response.status_code == 200:
             data = response.json()
             logger.info(data)
@@ -120,7 +120,7 @@ class Twitter:
             "grant_type": "refresh_token",
             "client_id": self._client_id
         }
-        response = requests.post(url=url, headers=headers, data=payload)
+        response = session.post(url=url, headers=headers, data=payload)
         if response.status_code in [200, 201]:
             data = response.json()
             self._access_token = data["access_token"]
@@ -134,7 +134,7 @@ class Twitter:
 
     def get_me(self):
         url = f"{BASE_URI}/1.1/account/verify_credentials.json"
-        response = requests.get(url=url, auth=self._oauth)
+        response = session.get(url=url, auth=self._oauth)
         if response.status_code == 200:
             data = response.json()
             pprint(data)
@@ -144,7 +144,7 @@ class Twitter:
 
     def get_mentions(self):
         url = "https://api.twitter.com/2/tweets/search/recent?query=from:TwitterDev&tweet.fields=created_at&expansions=author_id&user.fields=created_at"
-        response = requests.get(url=url, auth=self._oauth)
+        response = session.get(url=url, auth=self._oauth)
         if response.status_code == 200:
             data = response.json()
             pprint(data)
@@ -215,8 +215,8 @@ class Twitter:
             "Authorization": f"Bearer {self._access_token}",
             "Content-Type": "application/json"
         }
-        response = requests.post(url=url, headers=headers, json=payload,
-                                 timeout=TIMEOUT)
+        response = session.post(url=url, headers=headers, json=payload,
+                                timeout=TIMEOUT)
         if response.ok:
             return response.json()
         message_error = f"Error {response.status_code}: {response.text}"
@@ -227,7 +227,7 @@ class Twitter:
             "Authorization": f"Bearer {self._access_token}",
             "Accept": "application/json"
         }
-        response = requests.post(url=url, headers=headers, params=params)
+        response = session.post(url=url, headers=headers, params=params)
         if response.status_code in [200, 201]:
             return response.json()
         message_error = f"Error {response.status_code}: {response.text}"
@@ -236,7 +236,7 @@ class Twitter:
     def get_last_tweet(self, user_id, last_id):
         url = (f"{BASE_URI}/1.1/statuses/user_timeline.json?"
                f"user_id={user_id}&since_id={last_id}&count=1")
-        response = requests.get(url=url, auth=self._oauth1)
+        response = session.get(url=url, auth=self._oauth1)
         if response.status_code == 200:
             data = response.json()
             pprint(data)
@@ -263,6 +263,7 @@ class Twitter:
             try:
                 response = self._post(url, payload)
                 logger.debug(response)
+                return response
             except Exception as exception:
                 logger.error(exception)
 
@@ -295,8 +296,8 @@ class VideoTweet:
             'media_category': 'tweet_video'
         }
 
-        req = requests.post(url=MEDIA_ENDPOINT_URL, data=request_data,
-                            auth=self.oauth)
+        req = session.post(url=MEDIA_ENDPOINT_URL, data=request_data,
+                           auth=self.oauth, timeout=UPLOAD_TIMEOUT)
         media_id = req.json()['media_id']
 
         self.media_id = media_id
@@ -314,8 +315,8 @@ class VideoTweet:
             'media_id': self.media_id
         }
 
-        req = requests.post(url=MEDIA_ENDPOINT_URL, data=request_data,
-                            auth=self.oauth)
+        req = session.post(url=MEDIA_ENDPOINT_URL, data=request_data,
+                           auth=self.oauth, timeout=UPLOAD_TIMEOUT)
         logger.debug(req.json())
 
         self.processing_info = req.json().get('processing_info', None)
@@ -350,8 +351,8 @@ class VideoTweet:
             'media_id': self.media_id
         }
 
-        req = requests.get(url=MEDIA_ENDPOINT_URL, params=request_params,
-                           auth=self.oauth)
+        req = session.get(url=MEDIA_ENDPOINT_URL, params=request_params,
+                          auth=self.oauth)
 
         self.processing_info = req.json().get('processing_info', None)
         self.check_status()
@@ -379,8 +380,9 @@ class VideoTweet:
                 'media': chunk
             }
 
-            req = requests.post(url=MEDIA_ENDPOINT_URL, data=request_data,
-                                files=files, auth=self.oauth)
+            req = session.post(url=MEDIA_ENDPOINT_URL, data=request_data,
+                               files=files, auth=self.oauth,
+                               timeout=UPLOAD_TIMEOUT)
 
             if req.status_code < 200 or req.status_code > 299:
                 logger.debug(req.status_code)
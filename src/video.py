@@ -22,12 +22,14 @@
 # SOFTWARE.
 
 import logging
+import threading
 from table import Table
 
 logger = logging.getLogger(__name__)
 
 
 class Video(Table):
+    __slots__ = ()
     TABLE = 'VIDEOS'
     UNIKEYS = ['yt_id']
     CREATE_TABLE_QUERY = (f"CREATE TABLE IF NOT EXISTS {TABLE}("
@@ -37,21 +39,92 @@ class Video(Table):
                           "YT_ID TEXT,"
                           "LINK TEXT,"
                           "PUBLISHED_AT TEXT)")
+    MIGRATIONS = [
+        [f"DELETE FROM {TABLE} WHERE id NOT IN "
+         f"(SELECT MIN(id) FROM {TABLE} GROUP BY yt_id)",
+         f"CREATE UNIQUE INDEX IF NOT EXISTS {TABLE}_YT_ID ON {TABLE}(yt_id)"],
+        f"CREATE INDEX IF NOT EXISTS {TABLE}_PUBLISHED_AT "
+        f"ON {TABLE}(published_at)",
+    ]
+
+    # bumped on every write, so the caches of the videos know they are old
+    _revision = 0
+    _revision_lock = threading.Lock()
+
+    @classmethod
+    def revision(cls):
+        return cls._revision
+
+    @classmethod
+    def touch(cls):
+        with cls._revision_lock:
+            Video._revision += 1
+
+    def save(self):
+        super().save()
+        self.touch()
+
+    @classmethod
+    def bulk_insert(cls, items, upsert=True):
+        try:
+            return super().bulk_insert(items, upsert)
+        finally:
+            cls.touch()
+
+    @classmethod
+    def page(cls, after=None, limit=100):
+        """
+        Returns a page of videos ordered by publication date and id.
+
+        The ordering is done by SQLite with the index on published_at, and
+        the page starts after the cursor, so going through the pages costs
+        the same whatever the page.
+
+        :param after: The (published_at, id) of the last video of the
+        previous page, or None for the first page.
+        :param limit: The maximum number of videos of the page.
+        :return: The videos and the cursor of the next page, None if it is
+        the last one.
+        """
+        # the rows after the cursor are in two ranges of the index, the rest
+        # of the videos published at the same time and the later ones
+        if after is None:
+            ranges = [cls.find()]
+        else:
+            published_at, id = after
+            if published_at is None:
+                ranges = [cls.find().where("published_at", "IS NULL")
+                          .where("id", ">", id),
+                          cls.find().where("published_at", "IS NOT NULL")]
+            else:
+                ranges = [cls.find().where("published_at", "=", published_at)
+                          .where("id", ">", id),
+                          cls.find().where("published_at", ">", published_at)]
+        videos = []
+        for query in ranges:
+            videos += query.order_by("published_at").order_by("id")\
+                .limit(limit + 1 - len(videos)).all()
+            if len(videos) > limit:
+                break
+        if len(videos) > limit:
+            videos = videos[:limit]
+            last = videos[-1]
+            return videos, (last.published_at, last.id)
+        return videos, None
 
     @classmethod
     def get_last_video_published(cls):
         """
         Returns the last video published.
 
-        This method fetches all videos, sorts them by publication date
-        (in descending order), and returns the first item in this sorted list.
-        If no videos are found, None is returned.
+        This method reads only the most recent video by publication date,
+        using the index on published_at. If no videos are found, None is
+        returned.
 
         :return: The last video published, or None if no such video exists.
         """
-        condition = "published_at IS NOT NULL ORDER BY published_at DESC"
-        items = cls.select(condition)
-        return items[0] if len(items) > 0 else None
+        return cls.find().where("published_at", "IS NOT NULL")\
+            .order_by("published_at", descending=True).first()
 
     @classmethod
     def new(cls, title, description, yt_id, link, published_at):
@@ -76,6 +149,19 @@ class Video(Table):
         video.save()
         return video
 
+    @classmethod
+    def new_many(cls, yt_videos):
+        """
+        Saves many videos in one transaction.
+
+        A video whose YouTube ID is already saved is updated.
+
+        :param yt_videos: The videos as dicts with the keys title,
+        description, yt_id, link and published_at.
+        :return: The number of videos saved.
+        """
+        return cls.bulk_insert(yt_videos)
+
     @classmethod
     def find_by_yt_id(cls, yt_id):
         """
@@ -88,7 +174,4 @@ class Video(Table):
         :return: A Video object representing the found video, or None if not
         found.
         """
-        items = cls.select(f"yt_id='{yt_id}'")
-        if items:
-            return items[0]
-        return None
+        return cls.find(yt_id=yt_id).first()
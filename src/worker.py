@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from job import Job
+
+logger = logging.getLogger(__name__)
+
+# 0 is a worker for every destination, so the jobs of a video run at once
+WORKERS = int(os.getenv("JOB_WORKERS", "0"))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+BACKOFF = int(os.getenv("JOB_BACKOFF", "60"))
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "30"))
+# longer than three tries of a handler with the (5, 60) seconds of the
+# HTTP session, so only a hung handler goes beyond it
+TIMEOUT = float(os.getenv("JOB_TIMEOUT", "600"))
+
+
+class WorkerPool:
+    """Drains the JOBS table with a pool of asyncio workers.
+
+    Every job is run by the handler of its destination, a blocking callable
+    that receives the video as a dict, in a thread of the pool, so the
+    default executor of the loop stays free for the requests. A job should
+    take less than `timeout` seconds, or the ones of its destination in
+    `timeouts`. A thread can not be stopped, so a job that takes longer is
+    only reported and stays running until its handler returns, a retry
+    while it runs could publish the video twice. By default there is a worker for every handler, so the
+    destinations of a video are published at the same time and the video
+    takes as long as the slowest one. Jobs that were running when the
+    process stopped are put back in the queue on `start`.
+    """
+
+    def __init__(self, handlers, workers=WORKERS, max_attempts=MAX_ATTEMPTS,
+                 backoff=BACKOFF, poll_interval=POLL_INTERVAL,
+                 timeout=TIMEOUT, timeouts=None):
+        self._handlers = handlers
+        self._timeout = timeout
+        self._timeouts = timeouts or {}
+        self._workers = workers or len(handlers)
+        self._max_attempts = max_attempts
+        self._backoff = backoff
+        self._poll_interval = poll_interval
+        self._tasks = []
+        self._lock = None
+        self._wakeup = None
+        self._executor = None
+
+    async def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self._workers,
+                                            thread_name_prefix="job")
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        recovered = await asyncio.to_thread(Job.recover)
+        logger.info("Start %s workers, %s jobs recovered", self._workers,
+                    recovered)
+        self._tasks = [asyncio.create_task(self._work(index))
+                       for index in range(self._workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor:
+            # the running jobs are recovered on the next start
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def timeout_for(self, destination):
+        return self._timeouts.get(destination, self._timeout)
+
+    def wake(self):
+        """Tells the workers that there are new jobs."""
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _claim(self):
+        async with self._lock:
+            job = await asyncio.to_thread(Job.next_due)
+            if job:
+                await asyncio.to_thread(job.start)
+            return job
+
+    async def _work(self, index):
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+            except Exception as exception:
+                logger.error(exception)
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(),
+                                           self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # there could be more jobs for the other workers
+            self._wakeup.set()
+            await self._run(index, job)
+
+    async def _run(self, index, job):
+        logger.info("Worker %s: %s in %s (attempt %s)", index, job.yt_id,
+                    job.destination, job.attempts)
+        handler = self._handlers.get(job.destination)
+        try:
+            if handler is None:
+                raise Exception(f"Unknown destination {job.destination}")
+            timeout = self.timeout_for(job.destination)
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, handler, job.get_payload())
+            try:
+                await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                logger.error("Worker %s: %s in %s takes more than %s "
+                             "seconds", index, job.yt_id, job.destination,
+                             timeout)
+                await future
+            await asyncio.to_thread(job.done)
+        except Exception as exception:
+            logger.error("Worker %s: %s in %s. %s", index, job.yt_id,
+                         job.destination, exception)
+            await asyncio.to_thread(job.fail, exception, self._max_attempts,
+                                    self._backoff)
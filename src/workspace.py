@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+import os
+import shutil
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WorkspaceFull(Exception):
+    def __init__(self, usage, quota):
+        super().__init__(f"Workspaces use {usage} bytes of {quota}")
+
+
+class WorkspaceInUse(Exception):
+    def __init__(self, name):
+        super().__init__(f"Workspace {name} is in use")
+
+
+def disk_usage(path):
+    """The bytes of the files under path."""
+    usage = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                usage += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return usage
+
+
+class Workspace:
+    """A scratch directory of a job, removed when the job succeeds."""
+
+    def __init__(self, manager, directory):
+        self._manager = manager
+        self.directory = directory
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def usage(self):
+        return disk_usage(self.directory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._manager.release(self, keep=exc_type is not None)
+        return False
+
+
+class Workspaces:
+    """Gives every job a scratch directory under root, by name.
+
+    A new workspace is refused with WorkspaceFull while the workspaces
+    take more than quota bytes, so the job fails and is retried later.
+    The directory of a workspace is removed when the job succeeds. When it
+    fails the directory is kept, so the retry with the same name finds the
+    partial files, and clean removes the ones not used for max_age
+    seconds.
+    """
+
+    def __init__(self, root=None, quota=None, max_age=None):
+        self._root = root or os.getenv("WORKSPACE_ROOT",
+                                       "/tmp/pyblisher")
+        self._quota = int(os.getenv("WORKSPACE_QUOTA", 20 * 1024 ** 3)) \
+            if quota is None else quota
+        self._max_age = int(os.getenv("WORKSPACE_MAX_AGE", 24 * 60 * 60)) \
+            if max_age is None else max_age
+        self._lock = threading.Lock()
+        self._active = set()
+
+    def usage(self):
+        return disk_usage(self._root)
+
+    def open(self, name):
+        """Returns the workspace of name, to be used in a with statement.
+
+        It has the files left by the last job with the same name if that
+        one failed.
+        """
+        directory = os.path.join(self._root, name)
+        os.makedirs(self._root, exist_ok=True)
+        with self._lock:
+            if directory in self._active:
+                raise WorkspaceInUse(name)
+            usage = self.usage()
+            if usage >= self._quota:
+                self._remove_stale()
+                usage = self.usage()
+            if usage >= self._quota:
+                raise WorkspaceFull(usage, self._quota)
+            os.makedirs(directory, exist_ok=True)
+            # the mtime is the last use, for clean
+            os.utime(directory)
+            self._active.add(directory)
+        logger.debug(f"Open workspace {directory}")
+        return Workspace(self, directory)
+
+    def release(self, workspace, keep=False):
+        """Removes the directory of the workspace, unless keep."""
+        logger.debug(f"Release workspace {workspace.directory} with "
+                     f"{workspace.usage()} bytes")
+        with self._lock:
+            self._active.discard(workspace.directory)
+            if not keep:
+                shutil.rmtree(workspace.directory, ignore_errors=True)
+
+    def clean(self):
+        """Removes the workspaces that are not in use and were last used
+        more than max_age seconds ago."""
+        with self._lock:
+            self._remove_stale()
+
+    def _remove_stale(self):
+        if not os.path.isdir(self._root):
+            return
+        limit = time.time() - self._max_age
+        for name in os.listdir(self._root):
+            directory = os.path.join(self._root, name)
+            if directory in self._active:
+                continue
+            try:
+                if os.stat(directory).st_mtime > limit:
+                    continue
+            except FileNotFoundError:
+                continue
+            logger.info(f"Remove stale workspace {directory}")
+            shutil.rmtree(directory, ignore_errors=True)
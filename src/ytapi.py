@@ -22,63 +22,209 @@
 # SOFTWARE.
 
 import logging
-import requests
+import os
+from concurrent.futures import ThreadPoolExecutor
+from transport import session
 
 logger = logging.getLogger(__name__)
 
 URL = 'https://www.googleapis.com/youtube/v3'
 YTURL = 'https://www.youtube.com'
+# the API does not accept more ids by request
+MAX_IDS = 50
+SNIPPET_WORKERS = int(os.getenv("YT_SNIPPET_WORKERS", 4))
 
 
 class YouTube:
 
-    def __init__(self, key):
+    def __init__(self, key, cache=None):
+        """
+        :param key: The key of the YouTube Data API.
+        :param cache: A ResponseCache for the responses of the API, so the
+        requests are conditional and the responses that did not change are
+        not read again.
+        """
         self.__key = key
+        self.__cache = cache
+        self.__uploads = {}
+
+    def __request(self, endpoint, params):
+        """Returns the data of the response of the endpoint, or None."""
+        url = f"{URL}/{endpoint}"
+        params = {**params, "key": self.__key}
+        if self.__cache:
+            return self.__cache.get(url, params)
+        response = session.get(url, params=params)
+        if response.status_code == 200:
+            return response.json()
+        logger.error(response.status_code)
+        logger.error(response.text)
+        return None
+
+    @staticmethod
+    def __hidden(snippet):
+        return snippet['title'].lower() in ('private video', 'deleted video')
+
+    @staticmethod
+    def __video(video_id, snippet):
+        return {"title": snippet['title'],
+                "description": snippet['description'],
+                "thumbnail": snippet['thumbnails']['high']['url'],
+                "yt_id": video_id,
+                "link": f"{YTURL}/watch?v={video_id}",
+                "published_at": snippet['publishedAt']}
+
+    def get_uploads_playlist(self, channel_id):
+        """Returns the id of the playlist with the uploads of the channel.
+
+        It costs one quota unit the first time, then it is remembered.
+        """
+        if channel_id in self.__uploads:
+            return self.__uploads[channel_id]
+        data = self.__request("channels", {"part": "contentDetails",
+                                           "id": channel_id})
+        if data and data["items"]:
+            playlist_id = data["items"][0]["contentDetails"][
+                "relatedPlaylists"]["uploads"]
+            self.__uploads[channel_id] = playlist_id
+            return playlist_id
+        # the uploads of UCxxx are in UUxxx
+        if channel_id.startswith("UC"):
+            return f"UU{channel_id[2:]}"
+        return None
+
+    def get_uploads(self, channel_id, published_after=None):
+        """
+        Returns the videos of the channel, the newest first.
+
+        Same as get_videos, but reading the uploads playlist of the channel,
+        that costs one quota unit by page instead of the 100 of a search,
+        and the snippets of the videos are read 50 at a time. Only the
+        pages up to published_after are read.
+
+        :param channel_id: The id of the channel.
+        :param published_after: Only the videos published at or after this
+        date, as returned by the API, are returned.
+        :return: The list of videos.
+        """
+        return sorted(self.iter_uploads(channel_id, published_after),
+                      key=lambda video: video["published_at"], reverse=True)
+
+    def iter_uploads(self, channel_id, published_after=None):
+        """Same as get_uploads, but yields the videos a page at a time."""
+        logger.debug(f"iter_uploads channel_id: {channel_id}, "
+                     f"published_after: {published_after}")
+        playlist_id = self.get_uploads_playlist(channel_id)
+        if not playlist_id:
+            return
+        params = {"part": "contentDetails",
+                  "playlistId": playlist_id,
+                  "maxResults": MAX_IDS}
+        for items in self.__pages("playlistItems", params):
+            ids = []
+            done = False
+            for item in items:
+                details = item['contentDetails']
+                published_at = details.get('videoPublishedAt')
+                if published_after and published_at and \
+                        published_at < published_after:
+                    done = True
+                    break
+                ids.append(details['videoId'])
+            snippets = self.get_snippets(ids)
+            videos = [self.__video(video_id, snippets[video_id])
+                      for video_id in ids if video_id in snippets and
+                      not self.__hidden(snippets[video_id])]
+            if published_after:
+                videos = [video for video in videos
+                          if video["published_at"] >= published_after]
+            yield from sorted(videos, key=lambda video: video["published_at"],
+                              reverse=True)
+            if done:
+                return
+
+    def __pages(self, endpoint, params, next_token=None):
+        """Yields the items of every page of the endpoint.
+
+        The next page is only requested when the previous one has been
+        consumed, so breaking out of the loop stops the requests.
+        """
+        params = dict(params)
+        while True:
+            if next_token:
+                params["pageToken"] = next_token
+            data = self.__request(endpoint, params)
+            if data is None:
+                return
+            yield data['items']
+            next_token = data.get('nextPageToken')
+            if not next_token:
+                return
+
+    def get_snippets(self, ids):
+        """Returns the snippets of the videos by id.
+
+        The ids are requested 50 by request, and the requests run
+        concurrently, SNIPPET_WORKERS at most. The ids of videos that are
+        private or do not exist are missing.
+        """
+        chunks = [ids[start:start + MAX_IDS]
+                  for start in range(0, len(ids), MAX_IDS)]
+        snippets = {}
+        if len(chunks) > 1:
+            workers = min(SNIPPET_WORKERS, len(chunks))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for result in executor.map(self.__get_snippets, chunks):
+                    snippets.update(result)
+        elif chunks:
+            snippets = self.__get_snippets(chunks[0])
+        return snippets
+
+    def __get_snippets(self, ids):
+        try:
+            data = self.__request("videos", {"part": "snippet",
+                                             "id": ",".join(ids),
+                                             "maxResults": MAX_IDS})
+        except Exception as exception:
+            logger.error(exception)
+            return {}
+        if data is None:
+            return {}
+        return {item["id"]: item["snippet"] for item in data["items"]}
 
     def get_videos(self, channel_id, published_after=None, next_token=None):
-        logger.debug(f"get_videos channel_id: {channel_id}, published_after: "
-                     f"{published_after}, next_token: {next_token}")
-        videos = []
-        url = f"{URL}/search"
+        return list(self.iter_videos(channel_id, published_after, next_token))
+
+    def iter_videos(self, channel_id, published_after=None, next_token=None):
+        """Yields the videos of the channel, the newest first.
+
+        The pages of the search are read as the videos are consumed, and it
+        stops at the first video published before published_after.
+        """
+        logger.debug(f"iter_videos channel_id: {channel_id}, "
+                     f"published_after: {published_after}, "
+                     f"next_token: {next_token}")
         params = {"part": "snippet",
                   "channelId": channel_id,
-                  "maxResults": 50,
+                  "maxResults": MAX_IDS,
                   "order": "date",
-                  "type": "video",
-                  "key": self.__key}
+                  "type": "video"}
         if published_after:
             params['publishedAfter'] = published_after
-        if next_token:
-            params["pageToken"] = next_token
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            for item in data['items']:
-                if item['snippet']['title'].lower() == 'private video' or \
-                        item['snippet']['title'].lower() == 'deleted video':
-                    continue
+        for items in self.__pages("search", params, next_token):
+            items = [item for item in items
+                     if not self.__hidden(item['snippet'])]
+            # the search snippets have the description cut
+            snippets = self.get_snippets([item['id']['videoId']
+                                          for item in items])
+            for item in items:
                 logger.debug(item)
                 video_id = item['id']['videoId']
-                link = f"{YTURL}/watch?v={video_id}"
-                snippet = self.get_snippet(video_id)
-                snippet = snippet if snippet else item["snippet"]
-                video = {
-                    "title": snippet['title'],
-                    "description": snippet['description'],
-                    "thumbnail": snippet['thumbnails']['high']['url'],
-                    "yt_id": video_id,
-                    "link": link,
-                    "published_at": snippet['publishedAt']}
-                videos.append(video)
-            if 'nextPageToken' in data and data['nextPageToken']:
-                more_videos = self.get_videos(channel_id,
-                                              published_after,
-                                              data['nextPageToken'])
-                videos += more_videos
-        else:
-            logger.error(response.status_code)
-            logger.error(response.text)
-        return videos
+                snippet = snippets.get(video_id, item["snippet"])
+                if published_after and \
+                        snippet['publishedAt'] < published_after:
+                    return
+                yield self.__video(video_id, snippet)
 
     def get_channels(self, for_user_name, next_token=None):
         logger.debug(f"get_channels for_user_name: {for_user_name}, "
@@ -91,7 +237,7 @@ class YouTube:
                   "key": self.__key}
         if next_token:
             params["pageToken"] = next_token
-        response = requests.get(url, params=params)
+        response = session.get(url, params=params)
         if response.status_code == 200:
             data = response.json()
             logger.debug(data)
@@ -102,39 +248,34 @@ class YouTube:
 
     def get_snippet(self, yt_id: str) -> dict | None:
         logger.debug(f"get_description for '{yt_id}'")
-        url = f"{URL}/videos"
-        params = {"part": "snippet",
-                  "id": yt_id,
-                  "key": self.__key}
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            if len(data["items"]) > 0:
-                return data["items"][0]["snippet"]
-        else:
-            logger.error(response.status_code)
-            logger.error(response.text)
-            print(response.status_code)
-            print(response.text)
-        return None
+        return self.get_snippets([yt_id]).get(yt_id)
 
     def get_videos_from_list(self, playlist_id, next_token=None,
                              reverse_list=False):
-        logger.debug(f"get_videos_from_list playlist_id: {playlist_id}, "
-                     f"next_token: {next_token}, reverse_list: {reverse_list}")
-        videos = []
-        url = (f"{URL}/playlistItems?part=snippet&maxResults=50"
-               f"&playlistId={playlist_id}&key={self.__key}")
-        if next_token:
-            url += f"&pageToken={next_token}"
-        logger.info(url)
-        response = requests.get(url=url)
-        if response.status_code == 200:
-            data = response.json()
-            for item in data['items']:
-                if item['snippet']['title'].lower() == 'private video' or \
-                        item['snippet']['title'].lower() == 'deleted video':
+        logger.info(f"Reverse: {reverse_list}")
+        return sorted(self.iter_videos_from_list(playlist_id, next_token),
+                      key=lambda k: k['position'], reverse=reverse_list)
+
+    def iter_videos_from_list(self, playlist_id, next_token=None,
+                              published_after=None):
+        """Yields the videos of the playlist in the order of the API.
+
+        When published_after is given it stops at the first video added to
+        the playlist before it, so it is useful for playlists with the
+        newest videos first, like the uploads of a channel.
+        """
+        logger.debug(f"iter_videos_from_list playlist_id: {playlist_id}, "
+                     f"next_token: {next_token}")
+        params = {"part": "snippet",
+                  "maxResults": MAX_IDS,
+                  "playlistId": playlist_id}
+        for items in self.__pages("playlistItems", params, next_token):
+            for item in items:
+                if self.__hidden(item['snippet']):
                     continue
+                if published_after and \
+                        item["snippet"]["publishedAt"] < published_after:
+                    return
                 video_id = item['snippet']['resourceId']['videoId']
                 link = f"{YTURL}/watch?v={video_id}&list={playlist_id}"
                 download_link = f"{YTURL}/watch?v={video_id}"
@@ -150,50 +291,27 @@ class YouTube:
                     "published": False
                 }
                 logger.debug(video)
-                videos.append(video)
-            if 'nextPageToken' in data and data['nextPageToken']:
-                more_videos = self.get_videos_from_list(playlist_id,
-                                                        data['nextPageToken'],
-                                                        reverse_list)
-                videos += more_videos
-        else:
-            logger.error(response.status_code)
-            logger.error(response.text)
-        logger.info(f"Reverse: {reverse_list}")
-        videos = sorted(videos, key=lambda k: k['position'],
-                        reverse=reverse_list)
-        return videos
+                yield video
 
     def get_playlists(self, channel_id, next_token=None):
-        logger.debug(f"get_playlist channel_id: {channel_id}, "
+        return list(self.iter_playlists(channel_id, next_token))
+
+    def iter_playlists(self, channel_id, next_token=None):
+        logger.debug(f"iter_playlists channel_id: {channel_id}, "
                      f"next_token: {next_token}")
-        playlists = []
-        url = (f"{URL}/playlists?part=snippet&maxResults=50"
-               f"&channelId={channel_id}&key={self.__key}")
-        if next_token:
-            url += f"&pageToken={next_token}"
-        logger.debug(f"url: {url}")
-        response = requests.get(url=url)
-        if response.status_code == 200:
-            data = response.json()
-            for item in data['items']:
+        params = {"part": "snippet",
+                  "maxResults": MAX_IDS,
+                  "channelId": channel_id}
+        for items in self.__pages("playlists", params, next_token):
+            for item in items:
                 playlist = {"yt_id": item['id'],
                             "title": item["snippet"]["title"],
                             "reverse": False}
                 logger.debug(playlist)
-                playlists.append(playlist)
-            if 'nextPageToken' in data and data['nextPageToken']:
-                more_playlists = self.get_playlists(channel_id,
-                                                    data['nextPageToken'])
-                playlists += more_playlists
-        else:
-            logger.error(response.status_code)
-            logger.error(response.text)
-        return playlists
+                yield playlist
 
 
 if __name__ == "__main__":
-    import os
     from dotenv import load_dotenv
     load_dotenv()
     yt_key = os.getenv('YT_KEY')
@@ -25,14 +25,71 @@
 import json
 import logging
 import os
-import yt_dlp
+import tempfile
+import threading
+import time
+from functools import lru_cache
 from plumbum import local
 from datetime import datetime
 from PIL import Image
 from retry import retry
+from yt_dlp.utils import download_range_func
+from ytdlpool import COOKIES, YtDlPool
 
 
 logger = logging.getLogger(__name__)
+pool = YtDlPool()
+FRAGMENTS = int(os.getenv("YTDL_FRAGMENTS", 4))
+CHUNK_SIZE = int(os.getenv("YTDL_CHUNK_SIZE", 10 * 1024 * 1024))
+progress = {}
+progress_lock = threading.Lock()
+
+
+def track(status):
+    """Progress hook of yt-dlp that adds up the files of every video."""
+    if status.get("status") != "finished":
+        return
+    yt_id = status.get("info_dict", {}).get("id")
+    with progress_lock:
+        files = progress.setdefault(yt_id, [])
+        files.append(status.get("total_bytes") or
+                     status.get("downloaded_bytes") or 0)
+
+
+# the fragments of DASH and HLS formats are downloaded concurrently and the
+# other ones by chunks, and the .part files are resumed by the retries. The
+# file is origen.mp4 both when the streams are merged and when the single
+# mp4 file of the fallback is downloaded
+VIDEO_FORMAT = "bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4"
+DOWNLOAD_OPTIONS = {"outtmpl": "origen.%(ext)s",
+                    "format": VIDEO_FORMAT,
+                    "merge_output_format": "mp4",
+                    "retries": 5,
+                    "fragment_retries": 10,
+                    "concurrent_fragment_downloads": FRAGMENTS,
+                    "http_chunk_size": CHUNK_SIZE,
+                    "continuedl": True,
+                    "progress_hooks": [track],
+                    "cookiefile": COOKIES}
+CLIP_OUTTMPL = "destino.%(ext)s"
+# where the files are written when no directory is given
+TMP = "/tmp"
+THUMBNAIL_OPTIONS = {"outtmpl": "thumbnail",
+                     "writethumbnail": True,
+                     "skip_download": True,
+                     "retries": 5,
+                     "cookiefile": COOKIES}
+
+
+@lru_cache
+def clip_options(start, end):
+    """The options to download only from start to end seconds.
+
+    They are cached, so the pool reuses the instances of the same clip.
+    """
+    return {**DOWNLOAD_OPTIONS,
+            "outtmpl": CLIP_OUTTMPL,
+            "download_ranges": download_range_func(None, [(start, end)])}
 
 
 class YtDlMan:
@@ -47,32 +104,59 @@ class YtDlMan:
 
     @staticmethod
     @retry(tries=3, delay=30, logger=logger)
-    def download(yt_id):
+    def download(yt_id, directory=TMP):
+        """Downloads the video to origen.mp4 in the directory.
+
+        :return: A report with the bytes, the seconds and the throughput,
+        in bytes by second, of the download.
+        """
         logger.info("download")
-        url = f"https://www.youtube.com/watch?v={yt_id}"
-        ydl_opts = {"outtmpl": "/tmp/origen",
-                    "format": "bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4",
-                    "retries": 5,
-                    "cookiefile": "/app/cookies.txt"}
+        return YtDlMan.__download(yt_id, DOWNLOAD_OPTIONS, directory)
+
+    @staticmethod
+    @retry(tries=3, delay=30, logger=logger)
+    def download_clip(yt_id, start=0, end=45, directory=TMP):
+        """Downloads from start to end seconds of the video to
+        destino.mp4 in the directory.
+
+        Only the fragments, or the byte ranges, that cover the clip are
+        downloaded, and ffmpeg cuts them.
+
+        :return: The same report as download, with the clip.
+        """
+        logger.info(f"download_clip from {start} to {end}")
+        report = YtDlMan.__download(yt_id, clip_options(start, end),
+                                    directory)
+        report["clip"] = [start, end]
+        return report
+
+    @staticmethod
+    def __download(yt_id, options, directory):
         logger.info("Start download")
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
+        with progress_lock:
+            progress.pop(yt_id, None)
+        start = time.perf_counter()
+        pool.download([yt_id], options, directory)
+        elapsed = time.perf_counter() - start
+        with progress_lock:
+            files = progress.pop(yt_id, [])
+        report = {"yt_id": yt_id,
+                  "files": len(files),
+                  "bytes": sum(files),
+                  "elapsed": round(elapsed, 3),
+                  "throughput": round(sum(files) / elapsed) if elapsed else 0,
+                  "fragments": FRAGMENTS}
+        logger.info(f"End download: {report}")
+        return report
 
     @staticmethod
     @retry(tries=3, delay=30, logger=logger)
-    def download_thumbnail(yt_id):
+    def download_thumbnail(yt_id, directory=TMP):
         logger.info("download_thumbnail")
-        tmpl = "/tmp/thumbnail"
+        tmpl = os.path.join(directory, THUMBNAIL_OPTIONS["outtmpl"])
         src = f"{tmpl}.webp"
         dst = f"{tmpl}.jpg"
-        url = f"https://www.youtube.com/watch?v={yt_id}"
-        ydl_opts = {"outtmpl": tmpl,
-                    "writethumbnail": True,
-                    "skip_download": True,
-                    "retries": 5,
-                    "cookiefile": "/app/cookies.txt"}
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
+        pool.download([yt_id], THUMBNAIL_OPTIONS, directory)
         if os.path.exists(src):
             logger.info("Start convert from webp to jpg")
             image = Image.open(src)
@@ -83,6 +167,17 @@ class YtDlMan:
     @staticmethod
     @retry(tries=3, delay=30, logger=logger)
     def get_videos(yt_channel, published_at="1970-01-01T00:00:00Z"):
+        videos = list(YtDlMan.iter_videos(yt_channel, published_at))
+        return sorted(videos, key=lambda k: k["published_at"])
+
+    @staticmethod
+    def iter_videos(yt_channel, published_at="1970-01-01T00:00:00Z"):
+        """Yields the videos of the channel as yt-dlp dumps them.
+
+        Every line of --dump-json is parsed as soon as it arrives and only
+        the fields of the video are kept, so the memory does not grow with
+        the channel. Closing the generator stops yt-dlp.
+        """
         logger.debug(f"channel: {yt_channel} and published_at: {published_at}")
         cookies = os.getenv("COOKIES")
         logger.debug(f"cookies: {cookies}")
@@ -90,25 +185,36 @@ class YtDlMan:
                 .strptime(published_at, "%Y-%m-%dT%H:%M:%SZ")\
                 .strftime("%Y%m%d")
         logger.info(f"Search videos at: {published_at}")
-        videos = []
         url = f"https://www.youtube.com/channel/{yt_channel}"
         yt_dlp_bin = local["yt-dlp"]
-        p = yt_dlp_bin.popen(["--dateafter", published_at, "--dump-json",
-                            "--break-on-reject", "--cookies", cookies, url])
-        p.wait()
-        output, err = p.communicate()
-        logger.debug(f"Output: {output}")
-        for item in output.split("\n"):
-            if item:
-                item = json.loads(item)
-                ts = datetime.strptime(item["upload_date"], "%Y%m%d")
-                video = {
-                    "title": item["title"],
-                    "description": item["description"],
-                    "thumbnail": item["thumbnail"],
-                    "yt_id": item["id"],
-                    "link": item["original_url"],
-                    "published_at": ts.strftime("%Y-%m-%dT%H:%M:%SZ")
-                }
-                videos.append(video)
-        return sorted(videos, key=lambda k: k["published_at"])
+        # stderr goes to a file, a full pipe would block yt-dlp
+        with tempfile.TemporaryFile() as err:
+            p = yt_dlp_bin.popen(["--dateafter", published_at, "--dump-json",
+                                  "--break-on-reject", "--cookies", cookies,
+                                  url], stderr=err)
+            try:
+                for line in p.stdout:
+                    if line.strip():
+                        yield YtDlMan.__video(json.loads(line))
+                p.wait()
+            finally:
+                if p.poll() is None:
+                    logger.info("Stop yt-dlp")
+                    p.terminate()
+                    p.wait()
+                p.stdout.close()
+            # 101 is the exit code of --break-on-reject
+            if p.returncode not in (0, 101):
+                err.seek(0)
+                logger.warning(f"yt-dlp exited with {p.returncode}: "
+                               f"{err.read().decode(errors='replace')}")
+
+    @staticmethod
+    def __video(item):
+        ts = datetime.strptime(item["upload_date"], "%Y%m%d")
+        return {"title": item["title"],
+                "description": item["description"],
+                "thumbnail": item["thumbnail"],
+                "yt_id": item["id"],
+                "link": item["original_url"],
+                "published_at": ts.strftime("%Y-%m-%dT%H:%M:%SZ")}
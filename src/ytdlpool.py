@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import yt_dlp
+
+logger = logging.getLogger(__name__)
+
+YTURL = "https://www.youtube.com/watch?v="
+COOKIES = "/app/cookies.txt"
+
+
+class YtDlPool:
+    """Warm YoutubeDL instances, and threads to run them.
+
+    Creating a YoutubeDL initializes its extractors and loads the cookies,
+    so the instances are kept once used and reused by the calls with the
+    same options. An instance is used by one thread at a time, and at
+    most `size` calls run at once.
+
+    The calls for several ids run concurrently, so their options must
+    write every id to its own file, with %(id)s in the outtmpl.
+    """
+
+    def __init__(self, size=None):
+        self._size = size or int(os.getenv("YTDL_POOL_SIZE", 2))
+        self._idle = {}
+        self._lock = threading.Lock()
+        # also bounds the calls for a single id, run in the caller thread
+        self._slots = threading.BoundedSemaphore(self._size)
+        self._executor = ThreadPoolExecutor(max_workers=self._size,
+                                            thread_name_prefix="ytdl")
+
+    @contextmanager
+    def borrow(self, options):
+        """Lends an idle YoutubeDL with the options, or a new one."""
+        # the hooks are keyed by their repr, stable while they live
+        key = json.dumps(options, sort_keys=True, default=repr)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            ydl = idle.pop() if idle else None
+        if ydl is None:
+            logger.debug("New YoutubeDL")
+            ydl = yt_dlp.YoutubeDL(dict(options))
+        try:
+            yield ydl
+        finally:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self._size:
+                    idle.append(ydl)
+                    ydl = None
+            if ydl:
+                ydl.close()
+
+    def run(self, options, function, yt_ids):
+        """Calls function(ydl, url) for every id, concurrently.
+
+        :return: The results in the order of the ids. If a call fails,
+        its exception is raised once all of them have finished.
+        """
+        def call(yt_id):
+            with self._slots, self.borrow(options) as ydl:
+                return function(ydl, f"{YTURL}{yt_id}")
+
+        if len(yt_ids) == 1:
+            return [call(yt_ids[0])]
+        futures = [self._executor.submit(call, yt_id) for yt_id in yt_ids]
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error:
+                raise error
+        return [future.result() for future in futures]
+
+    def download(self, yt_ids, options, directory=None):
+        """Downloads the videos, or the thumbnails, with the options.
+
+        :param directory: Where the files are written, instead of the
+        paths of the options, so the same warm instances write to the
+        workspace of every job.
+        """
+        def download(ydl, url):
+            if directory is None:
+                return ydl.download([url])
+            # yt-dlp reads the paths every time it names a file
+            paths = ydl.params.get("paths")
+            ydl.params["paths"] = {"home": directory, "temp": directory}
+            try:
+                return ydl.download([url])
+            finally:
+                ydl.params["paths"] = paths
+
+        return self.run(options, download, yt_ids)
+
+    def clear(self):
+        """Closes the idle instances, so the next calls create new ones."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for instances in idle.values():
+            for ydl in instances:
+                ydl.close()
@@ -22,7 +22,7 @@
 # SOFTWARE.
 
 import logging
-import requests
+from transport import session
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +39,8 @@ class ZincClient:
 
     def populate(self, data):
         try:
-            response = requests.post(self._url, headers=self._headers,
-                                     json=data)
+            response = session.post(self._url, headers=self._headers,
+                                    json=data)
             logger.debug("Status code: %s", response.status_code)
             logger.debug("Response: %s", response.text)
             if response.status_code == 200:
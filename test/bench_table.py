@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Per query overhead of Table on a VIDEOS table with 100k rows.
+
+The legacy numbers open a new connection for every statement, with the
+default pragmas, as Table did before the connection manager. Both
+databases have the same indexes, so only the per query overhead differs.
+
+    python test/bench_table.py
+"""
+
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(__file__), "../src")))
+from table import Table
+from video import Video
+
+ROWS = 100_000
+LOOPS = 1_000
+DATABASE = "bench.db"
+LEGACY_DATABASE = "bench_legacy.db"
+
+
+def remove(database):
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(database + suffix):
+            os.remove(database + suffix)
+
+
+def fill(conn):
+    rows = [(f"Title {index}", f"Description {index}", f"yt_{index}",
+             f"https://www.youtube.com/watch?v=yt_{index}",
+             f"2024-01-01T00:00:{index % 60:02d}Z")
+            for index in range(ROWS)]
+    conn.executemany("INSERT INTO VIDEOS (title, description, yt_id, link, "
+                     "published_at) VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+
+
+def legacy_select(sqlquery):
+    conn = sqlite3.connect(LEGACY_DATABASE)
+    try:
+        return conn.execute(sqlquery).fetchall()
+    finally:
+        conn.close()
+
+
+def legacy_execute(sqlquery, data):
+    conn = sqlite3.connect(LEGACY_DATABASE)
+    try:
+        conn.execute(sqlquery, data)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class LegacyRow:
+    """A row as Table built it before the slots: a __dict__ per instance."""
+
+    def __init__(self):
+        for column in Video.COLUMNS:
+            setattr(self, column, None)
+
+    @classmethod
+    def from_list(cls, result):
+        item = cls()
+        for index, column in enumerate(Video.COLUMNS):
+            setattr(item, column, result[index])
+        return item
+
+
+def materialize(name, function, rows):
+    start = time.perf_counter()
+    function(rows)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    items = function(rows)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    print(f"{name:<24} {elapsed / len(rows) * 1e6:10.2f} us/row "
+          f"{size / len(rows):8.0f} bytes/row")
+
+
+def measure(name, function, loops=LOOPS):
+    start = time.perf_counter()
+    for index in range(loops):
+        function(index)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed / loops * 1e6:10.1f} us/query")
+
+
+def main():
+    remove(DATABASE)
+    remove(LEGACY_DATABASE)
+    Table.DATABASE = DATABASE
+    Video.inicializate()
+    fill(sqlite3.connect(DATABASE))
+    conn = sqlite3.connect(LEGACY_DATABASE)
+    conn.execute(Video.CREATE_TABLE_QUERY)
+    for migration in Video.MIGRATIONS:
+        for statement in [migration] if isinstance(migration, str) \
+                else migration:
+            conn.execute(statement)
+    fill(conn)
+    conn.close()
+
+    columns = ",".join(Video.COLUMNS)
+    keys = [key for key in Video.COLUMNS if key != "id"]
+    update = (f"UPDATE VIDEOS SET {','.join(f'{key}=?' for key in keys)} "
+              "WHERE id=?")
+    video = Video.get_by_id(1)
+    data = [video.get(key) for key in keys] + [video.id]
+    lookups = max(1, LOOPS // 10)
+
+    print(f"{ROWS} rows, {LOOPS} loops")
+    measure("legacy select", lambda index: legacy_select(
+        f"SELECT {columns} FROM VIDEOS WHERE id='{index + 1}'"))
+    measure("select", lambda index: Video.get_by_id(index + 1))
+    measure("legacy save", lambda index: legacy_execute(update, data))
+    measure("save", lambda index: video.save())
+    measure("legacy exists", lambda index: legacy_select(
+        f"SELECT {columns} FROM VIDEOS WHERE yt_id='yt_{index}'"), lookups)
+    measure("exists", lambda index: Video.from_dict(
+        {"yt_id": f"yt_{index}"}).exists(), lookups)
+
+    rows = sqlite3.connect(DATABASE).execute(
+        f"SELECT {columns} FROM VIDEOS").fetchall()
+    materialize("legacy rows", lambda rows: [
+        LegacyRow.from_list(row) for row in rows], rows)
+    materialize("rows", Video.from_rows, rows)
+
+    Table.close_connections()
+    remove(DATABASE)
+    remove(LEGACY_DATABASE)
+
+
+if __name__ == "__main__":
+    main()
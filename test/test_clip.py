@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from unittest import mock
+sys.path.append(os.path.join("../src"))
+import clip
+from clip import PROFILES, can_copy, make_clip, video_bitrate
+
+H264 = [{"codec_type": "video", "codec_name": "h264", "height": 720},
+        {"codec_type": "audio", "codec_name": "aac"}]
+
+
+class Command:
+    """ffmpeg or ffprobe, records the calls and writes the output."""
+
+    def __init__(self, calls, output="", size=0):
+        self._calls = calls
+        self._output = output
+        self._size = size
+
+    def __getitem__(self, args):
+        def run():
+            args_list = list(args) if isinstance(args, tuple) else args
+            self._calls.append(args_list)
+            if self._size:
+                with open(args_list[-1], "wb") as fw:
+                    fw.write(b"0" * self._size)
+            return self._output
+        return run
+
+
+class TestMakeClip(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.destination = os.path.join(self.directory, "destino.mp4")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_clip(self, streams, size):
+        self.probes = []
+        self.calls = []
+        commands = {
+            "ffprobe": Command(self.probes, json.dumps({"streams": streams})),
+            "ffmpeg": Command(self.calls, size=size)}
+        with mock.patch.object(clip, "local", commands):
+            return make_clip("origen.mp4", self.destination, 0, 45,
+                             PROFILES["mastodon"])
+
+    def test_copy(self):
+        self.assertEqual(self.make_clip(H264, 100), self.destination)
+        self.assertEqual(len(self.calls), 1)
+        args = self.calls[0]
+        self.assertEqual(args[args.index("-ss") + 1], "0")
+        self.assertEqual(args[args.index("-t") + 1], "45")
+        self.assertEqual(args[args.index("-movflags") + 1], "+faststart")
+        self.assertEqual(args[-3:], ["-c", "copy", self.destination])
+
+    def test_too_big(self):
+        self.make_clip(H264, PROFILES["mastodon"]["max_bytes"] + 1)
+        self.assertEqual(len(self.calls), 2)
+        self.assertIn("libx264", self.calls[1])
+        bitrate = video_bitrate(PROFILES["mastodon"], 45)
+        self.assertIn(f"{bitrate}k", self.calls[1])
+
+    def test_encode(self):
+        streams = [{"codec_type": "video", "codec_name": "vp9",
+                    "height": 2160}]
+        self.make_clip(streams, 100)
+        self.assertEqual(len(self.calls), 1)
+        self.assertIn("libx264", self.calls[0])
+        self.assertIn("scale=-2:'min(720,ih)'", self.calls[0])
+        self.assertEqual(self.calls[0][-1], self.destination)
+        self.assertEqual(self.probes[0][-1], "origen.mp4")
+
+
+class TestClip(unittest.TestCase):
+
+    def test_video_bitrate(self):
+        # 40 MB in 45 seconds leave room for more than the maximum
+        self.assertEqual(video_bitrate(PROFILES["mastodon"], 45), 2500)
+        bitrate = video_bitrate(PROFILES["mastodon"], 600)
+        self.assertLess((bitrate + 128) * 1000 / 8 * 600,
+                        PROFILES["mastodon"]["max_bytes"])
+
+    def test_can_copy(self):
+        streams = [{"codec_type": "video", "codec_name": "h264",
+                    "height": 1080},
+                   {"codec_type": "audio", "codec_name": "aac"}]
+        self.assertTrue(can_copy(streams, PROFILES["twitter"]))
+        self.assertFalse(can_copy(streams, PROFILES["mastodon"]))
+        streams[0]["codec_name"] = "vp9"
+        self.assertFalse(can_copy(streams, PROFILES["twitter"]))
+        self.assertFalse(can_copy(streams[1:], PROFILES["twitter"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
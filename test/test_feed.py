@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+from unittest import mock
+sys.path.append(os.path.join("../src"))
+import feed
+from feed import ChannelFeed, parse
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "feed.xml")
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.raw = open(FIXTURE, "rb") if status_code == 200 else None
+
+    def close(self):
+        if self.raw:
+            self.raw.close()
+
+
+class TestFeed(unittest.TestCase):
+    def test_parse(self):
+        with open(FIXTURE, "rb") as stream:
+            videos = list(parse(stream))
+        self.assertEqual([video["yt_id"] for video in videos],
+                         ["video3", "video2", "video1"])
+        self.assertEqual(videos[0], {
+            "yt_id": "video3",
+            "title": "Tercer video",
+            "link": "https://www.youtube.com/watch?v=video3",
+            "published_at": "2024-07-03T16:00:00+00:00"})
+
+    def test_changed(self):
+        requests = []
+
+        def get(url, params=None, headers=None, stream=False):
+            requests.append(headers)
+            if headers.get("If-None-Match") == '"etag"':
+                return Response(304)
+            return Response(200, {"ETag": '"etag"'})
+
+        channel_feed = ChannelFeed("UCchannel")
+        with mock.patch.object(feed.session, "get", get):
+            self.assertTrue(channel_feed.changed("video2"))
+            self.assertFalse(channel_feed.changed("video3"))
+            self.assertEqual(channel_feed.latest()["yt_id"], "video3")
+        self.assertEqual(requests, [{}, {"If-None-Match": '"etag"'},
+                                    {"If-None-Match": '"etag"'}])
+
+    def test_failed(self):
+        channel_feed = ChannelFeed("UCchannel")
+        with mock.patch.object(feed.session, "get",
+                               return_value=Response(500)):
+            self.assertTrue(channel_feed.changed("video3"))
+
+
+if __name__ == '__main__':
+    unittest.main()
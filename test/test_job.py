@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+import asyncio
+import time
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(__file__), "../src")))
+from table import Table
+from job import Job
+from worker import WorkerPool
+
+Table.DATABASE = 'test.db'
+VIDEO = {"yt_id": "yt_id", "title": "titulo"}
+
+
+class TestJob(unittest.TestCase):
+    def setUp(self):
+        Table.close_connections()
+        if os.path.exists(Table.DATABASE):
+            os.remove(Table.DATABASE)
+        Job.inicializate()
+
+    def tearDown(self):
+        Table.close_connections()
+        if os.path.exists(Table.DATABASE):
+            os.remove(Table.DATABASE)
+
+    def test_enqueue(self):
+        jobs = Job.enqueue(VIDEO, ["telegram", "discord"])
+        self.assertEqual(len(jobs), 2)
+        jobs = Job.enqueue(VIDEO, ["telegram", "discord", "matrix"])
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(len(Job.get_all()), 3)
+        self.assertEqual(Job.next_due().get_payload(), VIDEO)
+
+    def test_fail_and_recover(self):
+        job = Job.enqueue(VIDEO, ["telegram"])[0]
+        job.start()
+        job.fail("Error", max_attempts=2, backoff=60)
+        self.assertEqual(job.state, Job.PENDING)
+        self.assertIsNone(Job.next_due())
+        job.start()
+        job.fail("Error", max_attempts=2, backoff=60)
+        self.assertEqual(Job.get_by_id(job.id).state, Job.FAILED)
+        other = Job.enqueue(VIDEO, ["discord"])[0]
+        other.start()
+        self.assertEqual(Job.recover(), 1)
+        self.assertEqual(Job.get_by_id(other.id).state, Job.PENDING)
+
+    def test_worker_pool(self):
+        done = []
+
+        def handler(yt_video):
+            time.sleep(0.2)
+            done.append(yt_video["yt_id"])
+
+        def broken(yt_video):
+            raise Exception("Broken destination")
+
+        destinations = ["a", "b", "c", "d"]
+        handlers = {name: handler for name in destinations}
+        handlers["broken"] = broken
+        Job.enqueue(VIDEO, destinations + ["broken"])
+
+        async def run():
+            pool = WorkerPool(handlers, workers=5, max_attempts=1,
+                              poll_interval=0.05)
+            start = time.monotonic()
+            await pool.start()
+            while len(done) < 4 and time.monotonic() - start < 5:
+                await asyncio.sleep(0.05)
+            elapsed = time.monotonic() - start
+            await asyncio.sleep(0.1)
+            await pool.stop()
+            return elapsed
+
+        elapsed = asyncio.run(run())
+        self.assertLess(elapsed, 0.7)
+        states = {job.destination: job.state for job in Job.get_all()}
+        self.assertEqual(states["broken"], Job.FAILED)
+        self.assertEqual([states[name] for name in destinations],
+                         [Job.DONE] * 4)
+
+    def test_workers(self):
+        handlers = {name: print for name in ["a", "b", "c"]}
+        self.assertEqual(WorkerPool(handlers)._workers, 3)
+        self.assertEqual(WorkerPool(handlers, workers=1)._workers, 1)
+
+    def test_worker_timeout(self):
+        done = []
+
+        def slow(yt_video):
+            time.sleep(0.4)
+            done.append(yt_video["yt_id"])
+
+        Job.enqueue(VIDEO, ["slow"])
+
+        async def run():
+            pool = WorkerPool({"slow": slow}, workers=1, max_attempts=1,
+                              poll_interval=0.05, timeouts={"slow": 0.1})
+            start = time.monotonic()
+            await pool.start()
+            await asyncio.sleep(0.2)
+            # the job runs beyond its budget until the handler returns
+            state = Job.get_all()[0].state
+            while Job.get_all()[0].state == Job.RUNNING and \
+                    time.monotonic() - start < 5:
+                await asyncio.sleep(0.05)
+            await pool.stop()
+            return state
+
+        with self.assertLogs("worker", "ERROR"):
+            state = asyncio.run(run())
+        self.assertEqual(state, Job.RUNNING)
+        self.assertEqual(done, ["yt_id"])
+        job = Job.get_all()[0]
+        self.assertEqual(job.state, Job.DONE)
+        self.assertEqual(job.attempts, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(__file__), "../src")))
+from table import Table
+from publication import Publication
+from mediacache import MediaCache
+import media
+
+Table.DATABASE = 'test.db'
+DESTINATIONS = ["peertube", "twitter", "mastodon"]
+
+
+class TestMedia(unittest.TestCase):
+    def setUp(self):
+        Table.close_connections()
+        if os.path.exists(Table.DATABASE):
+            os.remove(Table.DATABASE)
+        Publication.inicializate()
+        self._root = tempfile.mkdtemp()
+        self._cache = MediaCache(os.path.join(self._root, "cache"))
+        self._directory = os.path.join(self._root, "workspace")
+        os.makedirs(self._directory)
+        self._calls = []
+        for name, filename in (("download", "origen.mp4"),
+                               ("download_clip", "destino.mp4")):
+            patcher = mock.patch.object(media.YtDlMan, name,
+                                        self.downloader(name, filename))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        Table.close_connections()
+        if os.path.exists(Table.DATABASE):
+            os.remove(Table.DATABASE)
+        shutil.rmtree(self._root)
+
+    def downloader(self, name, filename):
+        def download(yt_id, *args):
+            directory = args[-1]
+            self._calls.append((name, yt_id, args))
+            with open(os.path.join(directory, filename), "wb") as fw:
+                fw.write(b"0")
+            return {"yt_id": yt_id}
+        return download
+
+    def fetch(self, destinations=DESTINATIONS):
+        return media.fetch_media(self._cache, "yt_id", self._directory,
+                                 destinations)
+
+    def test_video(self):
+        report, origen = self.fetch()
+        self.assertEqual(report, {"yt_id": "yt_id"})
+        self.assertEqual(origen, self._cache.path(media.video_key("yt_id"),
+                                                  ".mp4"))
+        self.assertEqual([call[0] for call in self._calls], ["download"])
+
+    def test_peertube_done(self):
+        Publication.record("yt_id", "peertube", Publication.DONE, "uuid")
+        report, origen = self.fetch()
+        self.assertIsNone(origen)
+        self.assertEqual(self._calls[0][0], "download_clip")
+        self.assertEqual(self._calls[0][2][:2], (0, media.CLIP_SECONDS))
+        self.assertIsNotNone(self._cache.get(media.clip_key("yt_id"), ".mp4"))
+
+    def test_peertube_disabled(self):
+        _, origen = self.fetch(["twitter", "mastodon"])
+        self.assertIsNone(origen)
+        self.assertEqual([call[0] for call in self._calls], ["download_clip"])
+
+    def test_cached(self):
+        self.fetch()
+        report, origen = self.fetch()
+        self.assertEqual(report, {"yt_id": "yt_id", "cached": True})
+        self.assertIsNotNone(origen)
+        self.assertEqual(len(self._calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.join("../src"))
+from mediacache import MediaCache
+
+
+def producer(calls, size=10):
+    def produce(directory):
+        calls.append(directory)
+        with open(os.path.join(directory, "destino.mp4"), "wb") as fw:
+            fw.write(b"0" * size)
+        return {"bytes": size}
+    return produce
+
+
+class TestMediaCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.workspace = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def test_fetch(self):
+        cache = MediaCache(self.root, size=1024)
+        calls = []
+        key = {"yt_id": "yt_id", "kind": "clip", "clip": [0, 45]}
+        self.assertIsNone(cache.get(key, ".mp4"))
+        path, report = cache.fetch(key, "destino.mp4", producer(calls),
+                                   self.workspace)
+        self.assertEqual(report, {"bytes": 10})
+        self.assertTrue(path.startswith(self.root))
+        self.assertEqual(os.listdir(self.workspace), [])
+        self.assertEqual(cache.fetch(key, "destino.mp4", producer(calls),
+                                     self.workspace), (path, None))
+        self.assertEqual(cache.get(key, ".mp4"), path)
+        self.assertEqual(len(calls), 1)
+        other = {"yt_id": "yt_id", "kind": "clip", "clip": [0, 30]}
+        self.assertNotEqual(cache.fetch(other, "destino.mp4",
+                                        producer(calls), self.workspace)[0],
+                            path)
+        self.assertEqual(len(calls), 2)
+
+    def test_evict(self):
+        cache = MediaCache(self.root, size=25)
+        paths = []
+        for index in range(3):
+            path, _ = cache.fetch({"yt_id": index}, "destino.mp4",
+                                  producer([]), self.workspace)
+            os.utime(path, (index, index))
+            paths.append(path)
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertTrue(os.path.exists(paths[1]))
+        self.assertTrue(os.path.exists(paths[2]))
+        # the file produced is kept even if it does not fit
+        path, _ = cache.fetch({"yt_id": 3}, "destino.mp4",
+                              producer([], 100), self.workspace)
+        self.assertEqual([item[2] for item in cache.files()], [path])
+        self.assertEqual(cache._producing, {})
+
+    def test_lease(self):
+        cache = MediaCache(self.root, size=25)
+        with cache.lease() as lease:
+            used, _ = cache.fetch({"yt_id": 0}, "destino.mp4", producer([]),
+                                  self.workspace, lease)
+            os.utime(used, (0, 0))
+            self.assertEqual(cache.get({"yt_id": 0}, ".mp4", lease), used)
+            os.utime(used, (0, 0))
+            for index in range(1, 3):
+                path, _ = cache.fetch({"yt_id": index}, "destino.mp4",
+                                      producer([]), self.workspace)
+                os.utime(path, (index, index))
+            # the oldest file is in use, so the next one is evicted
+            self.assertTrue(os.path.exists(used))
+            self.assertEqual(len(cache.files()), 2)
+        self.assertEqual(lease.paths, [])
+        cache.fetch({"yt_id": 3}, "destino.mp4", producer([]),
+                    self.workspace)
+        self.assertFalse(os.path.exists(used))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.join("../src"))
+from pagecache import PageCache
+
+
+class TestPageCache(unittest.TestCase):
+    def test_get(self):
+        cache = PageCache(size=2)
+        builds = []
+
+        def build():
+            builds.append(1)
+            return [{"yt_id": "yt_id"}], {"Link": "next"}
+
+        etag, body, headers = cache.get("page", 1, build)
+        self.assertEqual(body, b'[{"yt_id":"yt_id"}]')
+        self.assertEqual(headers, {"Link": "next"})
+        self.assertEqual(cache.get("page", 1, build)[0], etag)
+        self.assertEqual(len(builds), 1)
+        cache.get("page", 2, build)
+        self.assertEqual(len(builds), 2)
+        cache.get("other", 2, build)
+        cache.get("another", 2, build)
+        cache.get("page", 2, build)
+        self.assertEqual(len(builds), 5)
+
+    def test_matches(self):
+        self.assertTrue(PageCache.matches('"a"', '"b", "a"'))
+        self.assertTrue(PageCache.matches('"a"', 'W/"a"'))
+        self.assertTrue(PageCache.matches('"a"', '*'))
+        self.assertFalse(PageCache.matches('"a"', '"b"'))
+        self.assertFalse(PageCache.matches('"a"', None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(__file__), "../src")))
+from table import Table
+from publication import Publication
+
+Table.DATABASE = 'test.db'
+
+
+class TestPublication(unittest.TestCase):
+    def setUp(self):
+        Table.close_connections()
+        if os.path.exists(Table.DATABASE):
+            os.remove(Table.DATABASE)
+        Publication.inicializate()
+        self._calls = []
+
+    def tearDown(self):
+        Table.close_connections()
+        if os.path.exists(Table.DATABASE):
+            os.remove(Table.DATABASE)
+
+    def publish(self, message):
+        self._calls.append(message)
+        return 1234
+
+    def broken(self, message):
+        self._calls.append(message)
+        raise Exception("Broken destination")
+
+    def swallowed(self, message):
+        self._calls.append(message)
+        return None
+
+    def test_run_once(self):
+        self.assertTrue(Publication.run("yt_id", "telegram", self.publish,
+                                        "Hola"))
+        self.assertFalse(Publication.run("yt_id", "telegram", self.publish,
+                                         "Hola"))
+        self.assertEqual(self._calls, ["Hola"])
+        publication = Publication.find_by_destination("yt_id", "telegram")
+        self.assertEqual(publication.status, Publication.DONE)
+        self.assertEqual(publication.remote_id, "1234")
+        self.assertIsNotNone(publication.latency_ms)
+
+    def test_run_failed(self):
+        with self.assertRaises(Exception):
+            Publication.run("yt_id", "discord", self.broken, "Hola")
+        publication = Publication.find_by_destination("yt_id", "discord")
+        self.assertEqual(publication.status, Publication.FAILED)
+        self.assertTrue(Publication.run("yt_id", "discord", self.publish,
+                                        "Hola"))
+        self.assertTrue(Publication.is_done("yt_id", "discord"))
+        self.assertEqual(len(Publication.get_all()), 1)
+
+    def test_run_swallowed(self):
+        with self.assertRaises(Exception):
+            Publication.run("yt_id", "bluesky", self.swallowed, "Hola")
+        publication = Publication.find_by_destination("yt_id", "bluesky")
+        self.assertEqual(publication.status, Publication.FAILED)
+        self.assertIsNone(publication.remote_id)
+        self.assertFalse(Publication.is_done("yt_id", "bluesky"))
+
+
+if __name__ == '__main__':
+    unittest.main()
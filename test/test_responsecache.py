@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+import json
+from unittest import mock
+sys.path.append(os.path.join("../src"))
+import responsecache
+from table import Table
+from responsecache import CachedResponse, ResponseCache
+
+Table.DATABASE = 'test.db'
+URL = "https://www.googleapis.com/youtube/v3/videos"
+
+
+class Response:
+    def __init__(self, status_code, body="", etag=None):
+        self.status_code = status_code
+        self.text = body
+        self.headers = {"ETag": etag} if etag else {}
+        self.parsed = 0
+
+    def json(self):
+        self.parsed += 1
+        return json.loads(self.text)
+
+
+class FakeApi:
+    def __init__(self):
+        self.version = 1
+        self.responses = []
+
+    def get(self, url, params=None, headers=None):
+        etag = f'"{params["id"]}-{self.version}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            response = Response(304)
+        else:
+            response = Response(200, json.dumps(
+                {"items": [{"id": params["id"], "version": self.version}]}),
+                etag)
+        self.responses.append(response)
+        return response
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        Table.close_connections()
+        if os.path.exists(Table.DATABASE):
+            os.remove(Table.DATABASE)
+        CachedResponse.inicializate()
+        self.api = FakeApi()
+        patcher = mock.patch.object(responsecache.session, "get",
+                                    self.api.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        Table.close_connections()
+        if os.path.exists(Table.DATABASE):
+            os.remove(Table.DATABASE)
+
+    def statuses(self):
+        return [response.status_code for response in self.api.responses]
+
+    def test_key(self):
+        self.assertEqual(ResponseCache.key(URL, {"key": "secret", "id": "a",
+                                                 "part": "snippet"}),
+                         f"{URL}?id=a&part=snippet")
+
+    def test_ttl(self):
+        cache = ResponseCache(ttl=60)
+        data = cache.get(URL, {"id": "a", "key": "key"})
+        self.assertEqual(cache.get(URL, {"id": "a", "key": "other"}), data)
+        self.assertEqual(self.statuses(), [200])
+
+    def test_not_modified(self):
+        cache = ResponseCache(ttl=0)
+        data = cache.get(URL, {"id": "a"})
+        self.assertEqual(cache.get(URL, {"id": "a"}), data)
+        self.assertEqual(self.statuses(), [200, 304])
+        self.assertEqual(self.api.responses[1].parsed, 0)
+        # after a restart the body is read from disk
+        self.assertEqual(ResponseCache(ttl=0).get(URL, {"id": "a"}), data)
+        self.api.version = 2
+        data = cache.get(URL, {"id": "a"})
+        self.assertEqual(data["items"][0]["version"], 2)
+        self.assertEqual(self.statuses(), [200, 304, 304, 200])
+
+    def test_evict(self):
+        cache = ResponseCache(ttl=60, size=2)
+        for id in ("a", "b", "c"):
+            cache.get(URL, {"id": id})
+        self.assertEqual(CachedResponse.find().count(), 2)
+        self.assertIsNone(CachedResponse.find(
+            url=ResponseCache.key(URL, {"id": "a"})).first())
+
+
+if __name__ == '__main__':
+    unittest.main()
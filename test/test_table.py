@@ -26,12 +26,13 @@ import sys
 import logging
 import os
 sys.path.append(os.path.join("../src"))
-from table import Table
+from table import Table, InvalidQuery
 
 logger = logging.getLogger(__name__)
 
 
 class Sample(Table):
+    __slots__ = ()
     DATABASE = 'test.db'
     TABLE = 'SAMPLES'
     UNIKEYS = ['name']
@@ -42,13 +43,29 @@ class Sample(Table):
     """
 
 
+class Migrated(Table):
+    DATABASE = 'test.db'
+    TABLE = 'MIGRATED'
+    UNIKEYS = ['name']
+    CREATE_TABLE_QUERY = f"""
+    CREATE TABLE IF NOT EXISTS {TABLE}(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name STRING)
+    """
+    MIGRATIONS = [
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {TABLE}_NAME ON {TABLE}(name)",
+    ]
+
+
 class TestTable(unittest.TestCase):
     def setUp(self):
+        Sample.close_connections()
         if os.path.exists(Sample.DATABASE):
             os.remove(Sample.DATABASE)
         Sample.inicializate()
 
     def tearDown(self):
+        Sample.close_connections()
         if os.path.exists(Sample.DATABASE):
             os.remove(Sample.DATABASE)
 
@@ -118,6 +135,92 @@ class TestTable(unittest.TestCase):
         self.assertEqual(len(samples), 1)
         self.assertEqual(samples[0].name, "Sample 2")
 
+    def test_quotes(self):
+        logger.info("=== Test quotes ===")
+        sample1 = Sample.from_dict({"name": "Sample's 1"})
+        sample1.save()
+        sample2 = Sample.from_dict({"name": "Sample's 1"})
+        self.assertTrue(sample2.exists())
+        self.assertEqual(Sample.find(name="Sample's 1").first(), sample1)
+
+    def test_find(self):
+        logger.info("=== Test find ===")
+        for index in range(5):
+            Sample.from_dict({"name": f"Sample {index}"}).save()
+        samples = Sample.find().where("name", "!=", "Sample 0")\
+            .order_by("name", descending=True).limit(2).offset(1).all()
+        self.assertEqual([sample.name for sample in samples],
+                         ["Sample 3", "Sample 2"])
+        query = Sample.find().where("name", "IN", ["Sample 1", "Sample 2"])
+        self.assertEqual(query.count(), 2)
+        self.assertIsNone(Sample.find(name="Sample 9").first())
+        self.assertEqual(Sample.find().where("name", "LIKE", "Sample%")
+                         .count(), 5)
+
+    def test_build(self):
+        logger.info("=== Test build ===")
+        sqlquery1, params1 = Sample.find(name="a").limit(1).build()
+        sqlquery2, params2 = Sample.find(name="b").limit(1).build()
+        self.assertEqual(sqlquery1, sqlquery2)
+        self.assertEqual(params1, ["a", 1])
+        self.assertEqual(params2, ["b", 1])
+        with self.assertRaises(InvalidQuery):
+            Sample.find(unknown="a")
+        with self.assertRaises(InvalidQuery):
+            Sample.find().where("name", "; DROP TABLE", "a")
+
+    def test_migrations(self):
+        logger.info("=== Test migrations ===")
+        self.assertEqual(Sample.get_schema_version(), 0)
+        Migrated.inicializate()
+        self.assertEqual(Migrated.get_schema_version(), 1)
+        Migrated.MIGRATIONS = Migrated.MIGRATIONS + [
+            f"ALTER TABLE {Migrated.TABLE} ADD COLUMN extra TEXT"]
+        try:
+            Migrated.inicializate()
+            Migrated.inicializate()
+        finally:
+            Migrated.MIGRATIONS = Migrated.MIGRATIONS[:1]
+        self.assertEqual(Migrated.get_schema_version(), 2)
+        self.assertTrue('extra' in Migrated.COLUMNS)
+        Migrated.from_dict({"name": "Sample 1"}).save()
+        duplicated = Migrated.from_dict({"name": "Sample 1"})
+        duplicated.save()
+        self.assertIsNone(duplicated.id)
+        self.assertEqual(Migrated.find().count(), 1)
+
+    def test_rows(self):
+        logger.info("=== Test rows ===")
+        Sample.from_dict({"name": "uno"}).save()
+        sample = Sample.get_by_id(1)
+        self.assertIsInstance(sample, Sample)
+        self.assertFalse(hasattr(sample, "__dict__"))
+        with self.assertRaises(AttributeError):
+            sample.other = 1
+        self.assertEqual(sample.serialize(), {"id": 1, "name": "uno"})
+        self.assertEqual(dict(sample), {"id": 1, "name": "uno"})
+        self.assertEqual(str(sample), "id: 1\nname: uno")
+        self.assertEqual(Sample.from_list((1, "uno")), sample)
+        self.assertEqual(Sample(), Sample.from_dict({}))
+        self.assertEqual(Sample.from_rows([(1, "uno"), (2, "dos")])[1].name,
+                         "dos")
+        with self.assertRaises(ValueError):
+            Sample.from_rows([(1, "uno", "extra")])
+
+    def test_first_and_iter(self):
+        logger.info("=== Test first and iter_select ===")
+        for index in range(7):
+            Sample.from_dict({"name": f"Sample {index}"}).save()
+        sample = Sample.first("name LIKE ? ORDER BY name DESC", ["Sample%"])
+        self.assertEqual(sample.name, "Sample 6")
+        self.assertIsNone(Sample.first("name=?", ["Sample 9"]))
+        self.assertEqual(len(Sample.select(limit=3)), 3)
+        samples = Sample.iter_select("name != ?", ["Sample 0"], size=2)
+        self.assertEqual(next(samples).name, "Sample 1")
+        self.assertEqual(len(list(samples)), 5)
+        names = [item.name for item in Sample.find().order_by("id").iter(2)]
+        self.assertEqual(names, [f"Sample {index}" for index in range(7)])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -22,6 +22,7 @@
 # SOFTWARE.
 
 import unittest
+import time
 import sys
 import os
 sys.path.append(os.path.join("../src"))
@@ -33,11 +34,13 @@ Table.DATABASE = 'test.db'
 
 class TestVideo(unittest.TestCase):
     def setUp(self):
+        Table.close_connections()
         if os.path.exists(Table.DATABASE):
             os.remove(Table.DATABASE)
         Video.inicializate()
 
     def tearDown(self):
+        Table.close_connections()
         if os.path.exists(Table.DATABASE):
             os.remove(Table.DATABASE)
 
@@ -73,6 +76,7 @@ if __name__ == '__main__':
 # SOFTWARE.
 
 import unittest
+import time
 import sys
 import os
 sys.path.append(os.path.join("../src"))
@@ -84,11 +88,13 @@ Table.DATABASE = 'test.db'
 
 class TestVideo(unittest.TestCase):
     def setUp(self):
+        Table.close_connections()
         if os.path.exists(Table.DATABASE):
             os.remove(Table.DATABASE)
         Video.inicializate()
 
     def tearDown(self):
+        Table.close_connections()
         if os.path.exists(Table.DATABASE):
             os.remove(Table.DATABASE)
 
@@ -97,6 +103,68 @@ class TestVideo(unittest.TestCase):
         tvideo = Video.get_by_id(avideo.id)
         self.assertEqual(avideo, tvideo)
 
+    def test_indexes(self):
+        Video.new("titulo", "description", "yt_id", "link", "fecha")
+        duplicated = Video.new("titulo", "description", "yt_id", "link",
+                               "fecha")
+        self.assertIsNone(duplicated.id)
+        self.assertEqual(Video.get_schema_version(), len(Video.MIGRATIONS))
+        for condition in ("yt_id='yt_id'",
+                          "published_at IS NOT NULL "
+                          "ORDER BY published_at DESC LIMIT 1"):
+            plan = Table.raw_query("EXPLAIN QUERY PLAN SELECT id FROM VIDEOS "
+                                   f"WHERE {condition}")
+            self.assertTrue(any("INDEX" in str(row) for row in plan))
+
+    def test_last_video_published(self):
+        self.assertIsNone(Video.get_last_video_published())
+        Video.new("titulo", "description", "yt_id1", "link",
+                  "2024-01-02T00:00:00Z")
+        Video.new("titulo", "description", "yt_id2", "link",
+                  "2024-01-03T00:00:00Z")
+        Video.new("titulo", "description", "yt_id3", "link",
+                  "2024-01-01T00:00:00Z")
+        self.assertEqual(Video.get_last_video_published().yt_id, "yt_id2")
+
+    def test_new_many(self):
+        videos = [{"title": f"titulo {index}", "description": "description",
+                   "yt_id": f"yt_id{index}", "link": "link",
+                   "published_at": f"2024-01-01T00:00:{index:02d}Z"}
+                  for index in range(50)]
+        start = time.perf_counter()
+        self.assertEqual(Video.new_many(videos), 50)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(Video.find().count(), 50)
+        videos[0]["title"] = "otro titulo"
+        Video.new_many(videos[:1])
+        self.assertEqual(Video.find().count(), 50)
+        self.assertEqual(Video.find_by_yt_id("yt_id0").title, "otro titulo")
+
+    def test_page(self):
+        revision = Video.revision()
+        Video.new_many([{"yt_id": f"yt_id{index}",
+                         "published_at": f"2024-01-0{index % 3 + 1}"}
+                        for index in range(7)])
+        self.assertGreater(Video.revision(), revision)
+        videos, after = Video.page(limit=3)
+        yt_ids = [video.yt_id for video in videos]
+        while after:
+            videos, after = Video.page(after, limit=3)
+            yt_ids += [video.yt_id for video in videos]
+        self.assertEqual(yt_ids, ["yt_id0", "yt_id3", "yt_id6", "yt_id1",
+                                  "yt_id4", "yt_id2", "yt_id5"])
+
+    def test_page_without_date(self):
+        Video.new_many([{"yt_id": "yt_id0"}, {"yt_id": "yt_id1"},
+                        {"yt_id": "yt_id2", "published_at": "2024-01-01"}])
+        videos, after = Video.page(limit=1)
+        self.assertEqual(after, (None, videos[0].id))
+        videos, after = Video.page(after, limit=1)
+        self.assertEqual(videos[0].yt_id, "yt_id1")
+        videos, after = Video.page(after, limit=1)
+        self.assertEqual(videos[0].yt_id, "yt_id2")
+        self.assertIsNone(after)
+
 
 if __name__ == '__main__':
     unittest.main()
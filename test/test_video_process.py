@@ -34,11 +34,13 @@ Table.DATABASE = 'test.db'
 
 class TestVideo(unittest.TestCase):
     def setUp(self):
+        Table.close_connections()
         if os.path.exists(Table.DATABASE):
             os.remove(Table.DATABASE)
         Video.inicializate()
 
     def tearDown(self):
+        Table.close_connections()
         if os.path.exists(Table.DATABASE):
             os.remove(Table.DATABASE)
 
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+sys.path.append(os.path.join("../src"))
+from workspace import Workspaces, WorkspaceFull, WorkspaceInUse
+
+
+class TestWorkspaces(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_open(self):
+        workspaces = Workspaces(self.root, quota=1024)
+        with workspaces.open("yt_id1") as one, \
+                workspaces.open("yt_id2") as other:
+            self.assertNotEqual(one.directory, other.directory)
+            with open(one.path("origen.mp4"), "wb") as fw:
+                fw.write(b"0" * 100)
+            self.assertEqual(one.usage(), 100)
+            self.assertEqual(workspaces.usage(), 100)
+        self.assertFalse(os.path.exists(one.directory))
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_failure(self):
+        workspaces = Workspaces(self.root, quota=1024)
+        with self.assertRaises(ValueError):
+            with workspaces.open("yt_id") as workspace:
+                with open(workspace.path("origen.mp4.part"), "wb") as fw:
+                    fw.write(b"0" * 100)
+                raise ValueError()
+        # the retry resumes from the files of the failed attempt
+        with workspaces.open("yt_id") as retry:
+            self.assertEqual(retry.directory, workspace.directory)
+            self.assertTrue(os.path.exists(retry.path("origen.mp4.part")))
+        self.assertFalse(os.path.exists(workspace.directory))
+
+    def test_in_use(self):
+        workspaces = Workspaces(self.root)
+        with workspaces.open("yt_id"):
+            with self.assertRaises(WorkspaceInUse):
+                workspaces.open("yt_id")
+
+    def test_quota(self):
+        workspaces = Workspaces(self.root, quota=100)
+        with workspaces.open("yt_id1") as workspace:
+            with open(workspace.path("origen.mp4"), "wb") as fw:
+                fw.write(b"0" * 100)
+            with self.assertRaises(WorkspaceFull):
+                workspaces.open("yt_id2")
+        workspaces.open("yt_id2").__exit__(None, None, None)
+
+    def test_quota_stale(self):
+        workspaces = Workspaces(self.root, quota=100, max_age=60)
+        with self.assertRaises(ValueError):
+            with workspaces.open("yt_id1") as workspace:
+                with open(workspace.path("origen.mp4.part"), "wb") as fw:
+                    fw.write(b"0" * 100)
+                raise ValueError()
+        with self.assertRaises(WorkspaceFull):
+            workspaces.open("yt_id2")
+        old = time.time() - 120
+        os.utime(workspace.directory, (old, old))
+        with workspaces.open("yt_id2"):
+            self.assertFalse(os.path.exists(workspace.directory))
+
+    def test_clean(self):
+        old = time.time() - 120
+        for name in ("stale", "recent", "yt_id"):
+            os.makedirs(os.path.join(self.root, name))
+            os.utime(os.path.join(self.root, name), (old, old))
+        os.utime(os.path.join(self.root, "recent"))
+        workspaces = Workspaces(self.root, max_age=60)
+        with workspaces.open("yt_id"):
+            os.utime(os.path.join(self.root, "yt_id"), (old, old))
+            workspaces.clean()
+            self.assertEqual(sorted(os.listdir(self.root)),
+                             ["recent", "yt_id"])
+
+
+if __name__ == '__main__':
+    unittest.main()
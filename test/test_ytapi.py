@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+from unittest import mock
+sys.path.append(os.path.join("../src"))
+import ytapi
+from ytapi import YouTube
+
+CHANNEL = "UCchannel"
+
+
+class Response:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self._data = data
+        self.text = str(data)
+
+    def json(self):
+        return self._data
+
+
+def published_at(index):
+    return f"2024-01-{index // 24 + 1:02d}T{index % 24:02d}:00:00Z"
+
+
+def snippet(index):
+    return {"title": f"Video {index}", "description": "description",
+            "thumbnails": {"high": {"url": "thumbnail"}},
+            "publishedAt": published_at(index)}
+
+
+class FakeApi:
+    """The videos 1 to 120 of CHANNEL, the newest first."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params=None):
+        endpoint = url.rsplit("/", 1)[1]
+        self.requests.append((endpoint, dict(params)))
+        if endpoint == "channels":
+            return Response({"items": [{"contentDetails": {
+                "relatedPlaylists": {"uploads": "UUchannel"}}}]})
+        if endpoint == "playlistItems":
+            start = int(params.get("pageToken", 0))
+            items = [{"contentDetails": {
+                "videoId": f"id{index}",
+                "videoPublishedAt": published_at(index)}}
+                for index in range(120 - start, max(0, 70 - start), -1)]
+            data = {"items": items}
+            if start + 50 < 120:
+                data["nextPageToken"] = str(start + 50)
+            return Response(data)
+        if endpoint == "search":
+            start = int(params.get("pageToken", 0))
+            items = [{"id": {"videoId": f"id{index}"},
+                      "snippet": {**snippet(index), "description": "cut"}}
+                     for index in range(120 - start, max(0, 70 - start), -1)]
+            data = {"items": items}
+            if start + 50 < 120:
+                data["nextPageToken"] = str(start + 50)
+            return Response(data)
+        if endpoint == "videos":
+            # the video 7 is not found
+            return Response({"items": [
+                {"id": video_id,
+                 "snippet": snippet(int(video_id[2:]))}
+                for video_id in params["id"].split(",")
+                if video_id != "id7"]})
+        return Response({}, 404)
+
+
+class TestYouTube(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi()
+        patcher = mock.patch.object(ytapi.session, "get", self.api.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.youtube = YouTube("key")
+
+    def endpoints(self):
+        return [endpoint for endpoint, _ in self.api.requests]
+
+    def test_uploads_playlist(self):
+        self.assertEqual(self.youtube.get_uploads_playlist(CHANNEL),
+                         "UUchannel")
+        self.youtube.get_uploads_playlist(CHANNEL)
+        self.assertEqual(self.endpoints(), ["channels"])
+
+    def test_get_uploads(self):
+        videos = self.youtube.get_uploads(CHANNEL, published_at(118))
+        self.assertEqual([video["yt_id"] for video in videos],
+                         ["id120", "id119", "id118"])
+        self.assertEqual(self.endpoints(),
+                         ["channels", "playlistItems", "videos"])
+
+    def test_get_all_uploads(self):
+        videos = self.youtube.get_uploads(CHANNEL)
+        self.assertEqual(len(videos), 119)
+        self.assertEqual(self.endpoints().count("playlistItems"), 3)
+        self.assertEqual(self.endpoints().count("videos"), 3)
+
+    def test_get_snippets(self):
+        ids = [f"id{index}" for index in range(1, 121)]
+        snippets = self.youtube.get_snippets(ids)
+        self.assertEqual(len(snippets), 119)
+        self.assertEqual(snippets["id3"]["title"], "Video 3")
+        self.assertEqual(self.endpoints(), ["videos"] * 3)
+        self.assertEqual(self.youtube.get_snippet("id3")["title"], "Video 3")
+        self.assertIsNone(self.youtube.get_snippet("id7"))
+
+    def test_get_videos(self):
+        videos = self.youtube.get_videos(CHANNEL)
+        self.assertEqual(len(videos), 120)
+        self.assertEqual(self.endpoints().count("search"), 3)
+        self.assertEqual(self.endpoints().count("videos"), 3)
+        descriptions = {video["yt_id"]: video["description"]
+                        for video in videos}
+        self.assertEqual(descriptions["id8"], "description")
+        self.assertEqual(descriptions["id7"], "cut")
+
+    def test_iter_videos(self):
+        videos = self.youtube.iter_videos(CHANNEL)
+        self.assertEqual(next(videos)["yt_id"], "id120")
+        videos.close()
+        self.assertEqual(self.endpoints(), ["search", "videos"])
+        videos = list(self.youtube.iter_videos(CHANNEL, published_at(60)))
+        self.assertEqual(len(videos), 61)
+        self.assertEqual(videos[-1]["yt_id"], "id60")
+        self.assertEqual(self.endpoints().count("search"), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,188 @@
 import unittest
 import sys
 import os
+import json
+from unittest import mock
 from dotenv import load_dotenv
-sys.path.append(os.path.join("./src"))
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(__file__), "../src")))
 from pprint import pprint
+import ytdlman
 from ytdlman import YtDlMan
 
 
+def item(index):
+    return {"id": f"yt_{index}",
+            "title": f"Title {index}",
+            "description": f"Description {index}",
+            "thumbnail": f"https://i.ytimg.com/vi/yt_{index}/hq.jpg",
+            "original_url": f"https://www.youtube.com/watch?v=yt_{index}",
+            "upload_date": "20240510"}
+
+
+class Stdout:
+    def __init__(self, lines):
+        self._lines = lines
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for line in self._lines:
+            self.read += 1
+            yield line
+
+    def close(self):
+        self.closed = True
+
+
+class Process:
+    """A yt-dlp process that dumps the lines and exits with returncode."""
+
+    def __init__(self, lines, returncode=0):
+        self.stdout = Stdout(lines)
+        self.returncode = None
+        self.terminated = False
+        self._returncode = returncode
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        if self.returncode is None:
+            self.returncode = self._returncode
+        return self.returncode
+
+    def terminate(self):
+        self.terminated = True
+        self.returncode = -15
+
+
+class Command:
+    def __init__(self, process):
+        self.process = process
+        self.args = None
+
+    def popen(self, args, stderr=None):
+        self.args = args
+        return self.process
+
+
+class TestIterVideos(unittest.TestCase):
+    def iter_videos(self, process):
+        command = Command(process)
+        patcher = mock.patch.object(ytdlman, "local", {"yt-dlp": command})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return YtDlMan.iter_videos("channel", "2024-05-10T00:00:00Z")
+
+    def test_streaming(self):
+        lines = [json.dumps(item(index)).encode() + b"\n"
+                 for index in range(3)]
+        process = Process(lines[:1] + [b"\n"] + lines[1:], returncode=101)
+        videos = self.iter_videos(process)
+        video = next(videos)
+        # the first video is yielded before the other lines are read
+        self.assertEqual(process.stdout.read, 1)
+        self.assertEqual(video, {
+            "title": "Title 0",
+            "description": "Description 0",
+            "thumbnail": "https://i.ytimg.com/vi/yt_0/hq.jpg",
+            "yt_id": "yt_0",
+            "link": "https://www.youtube.com/watch?v=yt_0",
+            "published_at": "2024-05-10T00:00:00Z"})
+        self.assertEqual([video["yt_id"] for video in videos],
+                         ["yt_1", "yt_2"])
+        self.assertFalse(process.terminated)
+        self.assertTrue(process.stdout.closed)
+
+    def test_close(self):
+        lines = [json.dumps(item(index)).encode() for index in range(100)]
+        process = Process(lines)
+        videos = self.iter_videos(process)
+        self.assertEqual(next(videos)["yt_id"], "yt_0")
+        videos.close()
+        self.assertTrue(process.terminated)
+        self.assertTrue(process.stdout.closed)
+        self.assertEqual(process.stdout.read, 1)
+
+    def test_error(self):
+        process = Process([], returncode=1)
+        with self.assertLogs(ytdlman.logger, "WARNING"):
+            self.assertEqual(list(self.iter_videos(process)), [])
+
+
+def finished(yt_id, **sizes):
+    return {"status": "finished", "info_dict": {"id": yt_id}, **sizes}
+
+
+class TestProgress(unittest.TestCase):
+    def setUp(self):
+        with ytdlman.progress_lock:
+            ytdlman.progress.clear()
+
+    def test_track(self):
+        ytdlman.track({"status": "downloading", "info_dict": {"id": "yt_1"},
+                       "downloaded_bytes": 10})
+        ytdlman.track(finished("yt_1", total_bytes=100,
+                               downloaded_bytes=90))
+        ytdlman.track(finished("yt_1", downloaded_bytes=50))
+        ytdlman.track(finished("yt_2"))
+        self.assertEqual(ytdlman.progress, {"yt_1": [100, 50], "yt_2": [0]})
+
+    def test_report(self):
+        # a file of an older download of the video is not counted
+        ytdlman.track(finished("yt_1", total_bytes=1))
+
+        def download(yt_ids, options, directory):
+            for hook in options["progress_hooks"]:
+                hook(finished("yt_1", total_bytes=300))
+                hook(finished("yt_1", total_bytes=100))
+                hook(finished("yt_2", total_bytes=1000))
+
+        with mock.patch.object(ytdlman.pool, "download", download):
+            report = YtDlMan.download("yt_1", "/tmp/workspace")
+        self.assertEqual(report["yt_id"], "yt_1")
+        self.assertEqual(report["files"], 2)
+        self.assertEqual(report["bytes"], 400)
+        self.assertEqual(report["fragments"], ytdlman.FRAGMENTS)
+        self.assertGreater(report["throughput"], 0)
+        self.assertNotIn("yt_1", ytdlman.progress)
+
+
+class TestClipOptions(unittest.TestCase):
+    def test_clip_options(self):
+        options = ytdlman.clip_options(0, 45)
+        self.assertEqual(options["outtmpl"], "destino.%(ext)s")
+        self.assertEqual(options["merge_output_format"], "mp4")
+        self.assertEqual(options["format"], ytdlman.VIDEO_FORMAT)
+        self.assertEqual(options["progress_hooks"], [ytdlman.track])
+        ranges = options["download_ranges"]({"duration": 600}, None)
+        self.assertEqual([(item["start_time"], item["end_time"])
+                          for item in ranges], [(0, 45)])
+        # the options of a clip are not the ones of the whole video
+        self.assertNotIn("download_ranges", ytdlman.DOWNLOAD_OPTIONS)
+        self.assertEqual(ytdlman.DOWNLOAD_OPTIONS["outtmpl"],
+                         "origen.%(ext)s")
+
+    def test_cached(self):
+        # the same options, so the pool reuses the same warm instances
+        self.assertIs(ytdlman.clip_options(0, 45),
+                      ytdlman.clip_options(0, 45))
+        self.assertIsNot(ytdlman.clip_options(0, 45),
+                         ytdlman.clip_options(0, 30))
+
+    def test_download_clip(self):
+        calls = []
+
+        def download(yt_ids, options, directory):
+            calls.append((yt_ids, options, directory))
+
+        with mock.patch.object(ytdlman.pool, "download", download):
+            report = YtDlMan.download_clip("yt_1", 0, 45, "/tmp/workspace")
+        self.assertEqual(calls, [(["yt_1"], ytdlman.clip_options(0, 45),
+                                  "/tmp/workspace")])
+        self.assertEqual(report["clip"], [0, 45])
+
+
 class TestTYDlMan(unittest.TestCase):
     def test_search(self):
         load_dotenv()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2025 Lorenzo Carbonell <a.k.a. atareao>
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest import mock
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(__file__), "../src")))
+import ytdlpool
+from ytdlpool import YtDlPool
+
+OPTIONS = {"format": "mp4", "outtmpl": "origen"}
+OTHER_OPTIONS = {"format": "mp4", "outtmpl": "destino"}
+
+
+class YoutubeDL:
+    """Records what the pool does with every instance."""
+
+    instances = []
+
+    def __init__(self, params):
+        self.params = params
+        self.closed = False
+        self.downloads = []
+        YoutubeDL.instances.append(self)
+
+    def download(self, urls):
+        self.downloads.append((urls, self.params.get("paths")))
+        return 0
+
+    def close(self):
+        self.closed = True
+
+
+class TestYtDlPool(unittest.TestCase):
+    def setUp(self):
+        YoutubeDL.instances = []
+        patcher = mock.patch.object(ytdlpool.yt_dlp, "YoutubeDL", YoutubeDL)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self._pool = YtDlPool(size=2)
+
+    def test_warm(self):
+        with self._pool.borrow(OPTIONS) as ydl:
+            self.assertEqual(ydl.params, OPTIONS)
+        with self._pool.borrow(dict(OPTIONS)) as other:
+            self.assertIs(other, ydl)
+        self.assertEqual(len(YoutubeDL.instances), 1)
+        self.assertFalse(ydl.closed)
+
+    def test_borrowed(self):
+        with self._pool.borrow(OPTIONS) as ydl:
+            # an instance is used by one thread at a time
+            with self._pool.borrow(OPTIONS) as other:
+                self.assertIsNot(other, ydl)
+        self.assertEqual(len(YoutubeDL.instances), 2)
+        with self._pool.borrow(OPTIONS):
+            with self._pool.borrow(OPTIONS):
+                with self._pool.borrow(OPTIONS):
+                    pass
+        # only size instances are kept, the others are closed
+        self.assertEqual(len(YoutubeDL.instances), 3)
+        self.assertEqual(sum(instance.closed
+                             for instance in YoutubeDL.instances), 1)
+
+    def test_options(self):
+        with self._pool.borrow(OPTIONS) as ydl:
+            pass
+        with self._pool.borrow(OTHER_OPTIONS) as other:
+            self.assertIsNot(other, ydl)
+            self.assertEqual(other.params, OTHER_OPTIONS)
+        self.assertEqual(len(YoutubeDL.instances), 2)
+
+    def test_clear(self):
+        with self._pool.borrow(OPTIONS) as ydl:
+            pass
+        with self._pool.borrow(OTHER_OPTIONS) as other:
+            pass
+        self._pool.clear()
+        self.assertTrue(ydl.closed)
+        self.assertTrue(other.closed)
+        with self._pool.borrow(OPTIONS) as new:
+            self.assertIsNot(new, ydl)
+
+    def test_download(self):
+        self._pool.download(["yt_1", "yt_2"], OPTIONS, "/tmp/workspace")
+        downloads = sorted(download for instance in YoutubeDL.instances
+                           for download in instance.downloads)
+        paths = {"home": "/tmp/workspace", "temp": "/tmp/workspace"}
+        self.assertEqual(downloads, [
+            ([f"{ytdlpool.YTURL}yt_1"], paths),
+            ([f"{ytdlpool.YTURL}yt_2"], paths)])
+        # the warm instances keep the paths of their options
+        for instance in YoutubeDL.instances:
+            self.assertIsNone(instance.params.get("paths"))
+
+    def test_bound(self):
+        pool = YtDlPool(size=1)
+        running = []
+        peak = []
+
+        def download(ydl, url):
+            running.append(url)
+            peak.append(len(running))
+            time.sleep(0.05)
+            running.remove(url)
+
+        threads = [threading.Thread(target=pool.run,
+                                    args=(OPTIONS, download, [yt_id]))
+                   for yt_id in ("yt_1", "yt_2", "yt_3")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max(peak), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()